@@ -0,0 +1,111 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file baidu_batch.py
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+
+class TokenBucket:
+    '''
+    令牌桶限速：平均每秒rate个请求，最多连续burst个。多个线程共用。
+    '''
+
+    def __init__(self, rate, burst=1):
+        '''
+        :param rate: 每秒补充的令牌数
+        :param burst: 桶的容量
+        '''
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # 拿到一个令牌才返回，不够时睡到下一个令牌补上
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_with_retry(func, *args, retries=3, backoff=1.0, **kwargs):
+    '''
+    :param func: 需要调用的函数
+    :param retries: 失败后最多重试几次
+    :param backoff: 第一次重试前等待的秒数，之后每次翻倍（再加一点随机抖动）
+    :return: func的返回值，重试用完还失败就抛出最后一次的异常
+    '''
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.1))
+
+
+def to_wide(frames, value_column='index', words=None):
+    '''
+    :param frames: {关键词: DataFrame}
+    :param value_column: 作为值的列
+    :param words: 列的顺序，默认按frames的顺序（并发请求时是完成的先后，每次可能不一样）
+    :return: 以日期为行、关键词为列的宽表
+    '''
+    columns = {}
+    for word in (frames if words is None else words):
+        df = frames.get(word)
+        if df is None or len(df) == 0 or value_column not in df.columns or 'date' not in df.columns:
+            continue
+        # 同一天有多行（比如不同终端）时取第一行
+        series = df.drop_duplicates('date').set_index('date')[value_column]
+        columns[word] = pd.to_numeric(series, errors='coerce')
+    if not columns:
+        return pd.DataFrame()
+    return pd.DataFrame(columns).sort_index()
+
+
+def compare_keywords(store, kind, words, start_date, end_date, cookie,
+                     max_workers=4, rate=2.0, burst=2, retries=3, backoff=1.0, on_result=None):
+    '''
+    :param store: BaiduIndexStore，已经保存的日期不会再请求，也不占用限速的令牌
+    :param kind: 'search'、'info' 或 'media'
+    :param words: 关键词列表
+    :param max_workers: 同时请求的线程数
+    :param rate: 每秒最多向gopup发出几个请求
+    :param burst: 最多连续发出几个请求
+    :param retries: 每个关键词失败后重试几次
+    :param backoff: 第一次重试前等待的秒数
+    :param on_result: 回调 on_result(关键词, DataFrame或None, 异常或None)，每个关键词完成时调用一次
+    :return: ({关键词: DataFrame}, {关键词: 异常})
+    '''
+    limiter = TokenBucket(rate, burst)
+    frames = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(call_with_retry, store.query, kind, word, start_date, end_date, cookie,
+                               retries=retries, backoff=backoff, limiter=limiter): word
+                   for word in words}
+        for future in as_completed(futures):
+            word = futures[future]
+            try:
+                frames[word] = future.result()
+                error = None
+            except Exception as exc:
+                errors[word] = error = exc
+            if on_result is not None:
+                on_result(word, frames.get(word), error)
+    # 按输入的关键词顺序返回，不按完成的先后
+    frames = {word: frames[word] for word in words if word in frames}
+    errors = {word: errors[word] for word in words if word in errors}
+    return frames, errors
@@ -0,0 +1,195 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file baidu_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date, timedelta
+
+import pandas as pd
+
+# 默认存储位置：项目目录下的 .cache/baidu_index.sqlite3
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'baidu_index.sqlite3')
+
+# 按日期的指数：search -> gopup.baidu_search_index，以此类推
+SERIES_KINDS = ('search', 'info', 'media')
+# 人群画像，没有日期，按ttl缓存
+PORTRAIT_KINDS = ('age', 'gender', 'interest')
+
+
+def missing_ranges(start_date, end_date, have):
+    '''
+    :param start_date: 开始日期
+    :param end_date: 截至日期（包含）
+    :param have: 已经有的日期集合
+    :return: [(开始, 截至)]，区间里缺少的连续日期段
+    '''
+    ranges = []
+    run_start = None
+    day = start_date
+    while day <= end_date:
+        if day in have:
+            if run_start is not None:
+                ranges.append((run_start, day - timedelta(days=1)))
+                run_start = None
+        elif run_start is None:
+            run_start = day
+        day += timedelta(days=1)
+    if run_start is not None:
+        ranges.append((run_start, end_date))
+    return ranges
+
+
+class BaiduIndexStore:
+    '''
+    百度指数的本地存储，按(指数类型, 关键词, 日期)保存在sqlite里。
+    查询时只向gopup请求本地还没有的日期段，再和已有的数据合并成DataFrame。
+    今天及以后的数据、最后一个有数据的日期之后的日期（可能还没发布）只返回不保存。人群画像没有日期，按ttl秒缓存。
+    '''
+
+    # 整段都没有数据时，分不清是这个词没有指数还是还没发布；早于这么多天的日期当作确定没有数据保存下来
+    publish_delay = 7
+
+    def __init__(self, path=DEFAULT_STORE_PATH, backend=None, portrait_ttl=24 * 3600):
+        '''
+        :param path: sqlite文件路径
+        :param backend: 提供 baidu_search_index 等函数的模块，None时使用gopup（测试时可以换成假的模块）
+        :param portrait_ttl: 人群画像缓存的秒数
+        '''
+        self.path = path
+        self.backend = backend
+        self.portrait_ttl = portrait_ttl
+        self._ready = False
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def _api(self, name):
+        if self.backend is None:
+            import gopup
+            self.backend = gopup
+        return getattr(self.backend, name)
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS series ('
+                'kind TEXT NOT NULL, keyword TEXT NOT NULL, date TEXT NOT NULL, rows TEXT NOT NULL, '
+                'PRIMARY KEY (kind, keyword, date))')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS portraits ('
+                'kind TEXT NOT NULL, keyword TEXT NOT NULL, fetched_at REAL NOT NULL, rows TEXT NOT NULL, '
+                'PRIMARY KEY (kind, keyword))')
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def query(self, kind, word, start_date, end_date, cookie, limiter=None):
+        '''
+        :param kind: 'search'、'info' 或 'media'
+        :param word: 关键词
+        :param start_date: 开始日期
+        :param end_date: 截至日期（包含）
+        :param cookie: 百度指数的cookie
+        :param limiter: 限速器（有acquire方法），每次真正请求gopup之前调用
+        :return: DataFrame，和直接调用gopup的列一样，date列是日期类型
+        '''
+        if kind not in SERIES_KINDS:
+            raise ValueError(f"未知的指数类型: {kind}")
+        with closing(self._connect()) as conn:
+            stored = dict(conn.execute(
+                'SELECT date, rows FROM series WHERE kind = ? AND keyword = ? AND date BETWEEN ? AND ?',
+                (kind, word, start_date.isoformat(), end_date.isoformat())).fetchall())
+        have = {date.fromisoformat(day) for day in stored}
+        fresh = {}
+        undated = []
+        today = date.today()
+        for run_start, run_end in missing_ranges(start_date, end_date, have):
+            if limiter is not None:
+                limiter.acquire()
+            df = self._api(f'baidu_{kind}_index')(word, run_start, run_end, cookie)
+            with self._lock:
+                self.fetches += 1
+            if df is None:
+                # 请求失败时不保存，下次还会重新请求
+                continue
+            if len(df) == 0:
+                # 这一段没有数据（比如冷门的词）：较早的日期保存成空的，下次不再请求
+                self._save_empty(kind, word, run_start, min(run_end, today - timedelta(days=self.publish_delay)))
+                continue
+            if 'date' not in df.columns:
+                # 没有日期列没法按天保存，只放进这次的结果
+                undated.extend(json.loads(df.to_json(orient='records', date_format='iso', force_ascii=False)))
+                continue
+            by_day = self._split_by_day(df)
+            fresh.update(by_day)
+            # 百度指数的数据晚几天才发布，最后一个有数据的日期之后的空白可能只是还没发布，不保存；
+            # 在它之前没有数据的日期才确定是空的。今天及以后的数据可能还不完整，也不保存
+            last = min(date.fromisoformat(max(by_day)), today - timedelta(days=1))
+            rows = []
+            day = run_start
+            while day <= last:
+                key = day.isoformat()
+                rows.append((kind, word, key, by_day.get(key, '[]')))
+                day += timedelta(days=1)
+            with closing(self._connect()) as conn, conn:
+                conn.executemany('INSERT OR REPLACE INTO series (kind, keyword, date, rows) VALUES (?, ?, ?, ?)', rows)
+        stored.update(fresh)
+        records = []
+        for key in sorted(stored):
+            records.extend(json.loads(stored[key]))
+        records.extend(undated)
+        df = pd.DataFrame.from_records(records)
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def _save_empty(self, kind, word, start_date, end_date):
+        rows = []
+        day = start_date
+        while day <= end_date:
+            rows.append((kind, word, day.isoformat(), '[]'))
+            day += timedelta(days=1)
+        if rows:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany('INSERT OR REPLACE INTO series (kind, keyword, date, rows) VALUES (?, ?, ?, ?)', rows)
+
+    @staticmethod
+    def _split_by_day(df):
+        # 把gopup返回的DataFrame按天分开，每天的行转成json
+        days = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+        return {key: group.to_json(orient='records', date_format='iso', force_ascii=False)
+                for key, group in df.groupby(days, sort=False)}
+
+    def portrait(self, kind, word, cookie):
+        '''
+        :param kind: 'age'、'gender' 或 'interest'
+        :param word: 关键词
+        :param cookie: 百度指数的cookie
+        :return: DataFrame，portrait_ttl秒之内直接用本地保存的结果
+        '''
+        if kind not in PORTRAIT_KINDS:
+            raise ValueError(f"未知的画像类型: {kind}")
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT fetched_at, rows FROM portraits WHERE kind = ? AND keyword = ?',
+                               (kind, word)).fetchone()
+        if row is not None and now - row[0] < self.portrait_ttl:
+            return pd.DataFrame.from_records(json.loads(row[1]))
+        df = self._api(f'baidu_{kind}_index')(word, cookie)
+        with self._lock:
+            self.fetches += 1
+        if df is None or len(df) == 0:
+            return df
+        rows = df.to_json(orient='records', date_format='iso', force_ascii=False)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO portraits (kind, keyword, fetched_at, rows) VALUES (?, ?, ?, ?)',
+                         (kind, word, now, rows))
+        # 和从本地读出来的结果保持一样的类型
+        return pd.DataFrame.from_records(json.loads(rows))
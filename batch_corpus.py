@@ -0,0 +1,142 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file batch_corpus.py
+# 不需要streamlit的批量语料处理：并发抓取很多网址，统计每个网址和全部网址的词频
+# 用法：python batch_corpus.py urls.txt --out output/ [--concurrency 32] [--per-host 4]
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import html_text
+import segment
+
+
+def process_page(content, encoding):
+    '''
+    在工作进程里执行：提取文本、清洗、分词、统计，和页面里用的是同样的几步
+    :param content: 网页的字节内容
+    :param encoding: 响应头里给出的编码
+    :return: Counter
+    '''
+    text = html_text.html_to_clean_text(content, encoding)
+    # 工作进程里已经是并行的了，这里不再切块
+    return segment.tokenize_and_count(text, parallel=False)
+
+
+def make_session(pool_size):
+    '''
+    :param pool_size: 连接池大小
+    :return: 复用连接的requests.Session
+    '''
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+async def fetch_and_count(url, session, pool, total_limit, host_limits, process_limit, timeout):
+    '''
+    :param process_limit: 从开始下载到处理完的页面数上限，下载比分词快时，
+                          下载好还没处理的网页内容不会在内存里无限堆积
+    :return: (网址, Counter或None, 错误信息或None)
+    '''
+    loop = asyncio.get_running_loop()
+    # 先拿同一个主机的名额，再拿处理的名额和总的名额，等待某个主机时不占用别的名额
+    async with host_limits[urlsplit(url).netloc]:
+        await process_limit.acquire()
+        try:
+            async with total_limit:
+                response = await loop.run_in_executor(None, lambda: session.get(url, timeout=timeout))
+                response.raise_for_status()
+        except requests.RequestException as error:
+            process_limit.release()
+            return url, None, str(error)
+    try:
+        encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else None
+        word_count = await loop.run_in_executor(pool, process_page, response.content, encoding)
+    except Exception as error:
+        # 个别页面解析失败不影响整批任务
+        return url, None, f"{type(error).__name__}: {error}"
+    finally:
+        process_limit.release()
+    return url, word_count, None
+
+
+async def run_pipeline(urls, out_dir, concurrency=32, per_host=4, workers=None, timeout=20):
+    '''
+    :param urls: 网址列表
+    :param out_dir: 输出目录，写入 counts.jsonl（每个网址一行）和 aggregate.json（全部网址合计）
+    :param concurrency: 同时进行的请求数
+    :param per_host: 同一个主机同时进行的请求数
+    :param workers: 清洗、分词的进程数，None时等于CPU核数。同时在下载和等待处理的页面最多 concurrency + 2 * workers 个
+    :param timeout: 每个请求的超时秒数
+    :return: 统计信息字典
+    '''
+    os.makedirs(out_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    session = make_session(concurrency)
+    total_limit = asyncio.Semaphore(concurrency)
+    process_limit = asyncio.Semaphore(concurrency + 2 * (workers or os.cpu_count() or 1))
+    host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+    aggregate = Counter()
+    ok = failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=segment.init_worker) as pool, \
+            open(os.path.join(out_dir, 'counts.jsonl'), 'w', encoding='utf-8') as out:
+        tasks = [fetch_and_count(url, session, pool, total_limit, host_limits, process_limit, timeout) for url in urls]
+        for finished in asyncio.as_completed(tasks):
+            url, word_count, error = await finished
+            if error is None:
+                ok += 1
+                aggregate.update(word_count)
+                out.write(json.dumps({'url': url, 'counts': dict(word_count.most_common())}, ensure_ascii=False) + '\n')
+            else:
+                failed += 1
+                out.write(json.dumps({'url': url, 'error': error}, ensure_ascii=False) + '\n')
+            done = ok + failed
+            if done % 100 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{done}/{len(urls)} 页  {done / elapsed:.1f} 页/秒", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(out_dir, 'aggregate.json'), 'w', encoding='utf-8') as out:
+        json.dump(dict(aggregate.most_common()), out, ensure_ascii=False)
+    session.close()
+    return {'pages': ok, 'failed': failed, 'seconds': elapsed,
+            'pages_per_second': (ok + failed) / elapsed if elapsed else 0.0}
+
+
+def read_urls(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith('#')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量抓取网址并统计词频")
+    parser.add_argument('urls', help="网址列表文件，每行一个")
+    parser.add_argument('--out', default='corpus_output', help="输出目录")
+    parser.add_argument('--concurrency', type=int, default=32, help="同时进行的请求数")
+    parser.add_argument('--per-host', type=int, default=4, help="同一个主机同时进行的请求数")
+    parser.add_argument('--workers', type=int, default=None, help="清洗、分词的进程数")
+    parser.add_argument('--timeout', type=float, default=20, help="每个请求的超时秒数")
+    args = parser.parse_args(argv)
+    stats = asyncio.run(run_pipeline(read_urls(args.urls), args.out, args.concurrency,
+                                     args.per_host, args.workers, args.timeout))
+    print(f"成功 {stats['pages']} 页，失败 {stats['failed']} 页，用时 {stats['seconds']:.1f} 秒，"
+          f"{stats['pages_per_second']:.1f} 页/秒")
+
+
+if __name__ == '__main__':
+    main()
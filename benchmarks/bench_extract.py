@@ -0,0 +1,76 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file bench_extract.py
+# 对比原来 BeautifulSoup(html.parser) + 三次 re.sub 和现在 lxml 提取 + 预编译正则清洗的吞吐量
+# 用法：python benchmarks/bench_extract.py [网址或本地html文件 ...]
+import os
+import re
+import sys
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import html_text
+
+DEFAULT_PAGES = [
+    "https://www.gov.cn/xinwen/2022-10/25/content_5721685.htm",
+    "https://www.gov.cn/",
+    "https://www.news.cn/politics/",
+]
+
+
+def old_extract(content, encoding):
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+    text = soup.get_text()
+    clean_text1 = re.sub(r'<.*?>', '', text)
+    clean_text2 = re.sub(r'[^\w\s]', '', clean_text1)
+    return re.sub(r'\s{1,}', ' ', clean_text2)
+
+
+def new_extract(content, encoding):
+    return html_text.html_to_clean_text(content, encoding)
+
+
+def load(source):
+    '''
+    :param source: 网址或本地文件
+    :return: (字节内容, 编码)
+    '''
+    if os.path.exists(source):
+        with open(source, 'rb') as file:
+            return file.read(), None
+    response = requests.get(source, timeout=30)
+    encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else None
+    return response.content, encoding
+
+
+def timeit(func, content, encoding, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content, encoding)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sources = sys.argv[1:] or DEFAULT_PAGES
+    for source in sources:
+        try:
+            content, encoding = load(source)
+        except (OSError, requests.RequestException) as error:
+            print(f"跳过 {source}: {error}")
+            continue
+        mb = len(content) / 1e6
+        old_seconds = timeit(old_extract, content, encoding, 5)
+        new_seconds = timeit(new_extract, content, encoding, 5)
+        print(f"{source}\n  {len(content)} 字节  "
+              f"bs4+re {mb / old_seconds:7.2f} MB/s  lxml+预编译 {mb / new_seconds:7.2f} MB/s  "
+              f"加速 {old_seconds / new_seconds:5.1f}x  "
+              f"词数 {len(old_extract(content, encoding))} -> {len(new_extract(content, encoding))} 字符")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file bench_keywords.py
+# 对比 del_key_self_word 原来逐个 str.count 的写法和 KeywordMatcher 一次扫描的耗时
+# 用法：python benchmarks/bench_keywords.py [文本字符数(百万)]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keyword_match import KeywordMatcher
+
+
+def make_text(n_chars, seed=0):
+    '''
+    :param n_chars: 大约生成多少个字符
+    :return: (文本, 词表)，文本由随机的汉字词语和标点、英文单词拼成
+    '''
+    rng = random.Random(seed)
+    chars = [chr(c) for c in range(0x4e00, 0x4e00 + 800)]
+    vocab = [''.join(rng.choices(chars, k=rng.choice([2, 2, 3, 4]))) for _ in range(20000)]
+    vocab += ['Policy', 'GDP', 'Internet', 'AI']
+    parts = []
+    size = 0
+    while size < n_chars:
+        word = rng.choice(vocab)
+        if rng.random() < 0.1:
+            word += rng.choice('，。、 \n')
+        parts.append(word)
+        size += len(word)
+    return ''.join(parts), vocab
+
+
+def loop_count(text, items):
+    # 原来的写法：每个关键词都把整篇文本转一次小写再扫描一遍
+    return {item: text.lower().count(item.lower()) for item in items}
+
+
+def main():
+    millions = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    text, vocab = make_text(int(millions * 1000000))
+    rng = random.Random(1)
+    print(f"文本长度 {len(text)} 字符")
+    for n in (10, 100, 1000):
+        items = rng.sample(vocab, n)
+        start = time.perf_counter()
+        expected = loop_count(text, items)
+        loop_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        got = KeywordMatcher(items).count(text)
+        ac_seconds = time.perf_counter() - start
+        assert got == expected
+        print(f"{n:>5} 个关键词  str.count循环 {loop_seconds:8.3f}s  Aho-Corasick {ac_seconds:8.3f}s  加速 {loop_seconds / ac_seconds:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file bench_startup.py
+# 冷启动耗时：每一轮都在新的子进程里用streamlit的AppTest运行home.py，分别测量
+#   import_streamlit  导入streamlit本身（和本项目无关，作为参照）
+#   first_run         第一次运行脚本：导入各模块并显示默认页面（默认网址的内容已经在页面缓存里）
+#   first_analysis    第一次分析网页：取本地服务器上的fixtures页面，提取、分词、画图
+# 每一轮用一个临时的页面缓存（环境变量 PAGE_CACHE_PATH），事先放进默认网址对应的fixture内容，
+# 整个过程不访问外网，也不读写项目里的 .cache/pages.sqlite3。
+# --cold 在每一轮之前删掉jieba的词典缓存，模拟容器重启后临时目录被清空的情况。
+# 用法：python benchmarks/bench_startup.py [--runs 5] [--cold]
+import argparse
+import glob
+import http.server
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+# 和home.py里输入框的默认值一致
+DEFAULT_URL = 'https://www.gov.cn/xinwen/2022-10/25/content_5721685.htm'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as file:
+        return file.read()
+
+
+def serve_fixture(name, body=None):
+    '''
+    :param body: 页面内容，默认是fixture文件的内容
+    :return: 在本地端口上提供fixture网页的网址
+    '''
+    if body is None:
+        body = read_fixture(name)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}/{name}'
+
+
+def seed_page_cache(path):
+    '''
+    把默认网址的内容放进path处新建的页面缓存，第一次运行直接命中缓存，不去请求gov.cn。
+    内容是small.html再加一段，和first_analysis分析的页面不同，不会命中分析结果的缓存。
+    '''
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import requests
+    from page_cache import PageCache
+    local_url = serve_fixture('default.html', read_fixture('small.html').replace(
+        b'</body>', '<p>默认页面。</p></body>'.encode('utf-8')))
+
+    class LocalSession(requests.Session):
+        # 所有请求都转到本地的默认页面
+        def request(self, method, url, *args, **kwargs):
+            return super().request(method, local_url, *args, **kwargs)
+
+    PageCache(path=path, session=LocalSession()).get(DEFAULT_URL, lambda content, encoding: '')
+
+
+def child():
+    # 在新进程里执行一轮，结果以JSON输出到标准输出
+    url = serve_fixture('small.html')
+    start = time.perf_counter()
+    import streamlit
+    from streamlit.testing.v1 import AppTest
+    import_streamlit = time.perf_counter() - start
+
+    app = AppTest.from_file(os.path.join(ROOT, 'home.py'), default_timeout=300)
+    start = time.perf_counter()
+    app.run()
+    first_run = time.perf_counter() - start
+    check(app)
+    if app.text_input[0].value != DEFAULT_URL:
+        raise SystemExit(f"home.py的默认网址变了，请更新DEFAULT_URL：{app.text_input[0].value}")
+
+    start = time.perf_counter()
+    app.text_input[0].set_value(url).run()
+    first_analysis = time.perf_counter() - start
+    check(app)
+    print(json.dumps({'import_streamlit': import_streamlit, 'first_run': first_run,
+                      'first_analysis': first_analysis}))
+
+
+def check(app):
+    # 每次运行之后都检查，出错的运行不能算进耗时
+    if app.exception:
+        raise SystemExit(app.exception[0].value)
+
+
+def clear_jieba_cache():
+    # jieba默认的缓存在系统临时目录，本项目的词典缓存在 .cache/jieba
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), 'jieba*.cache')):
+        os.remove(path)
+    for path in glob.glob(os.path.join(ROOT, '.cache', 'jieba', '*')):
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量冷启动的导入时间和第一次请求的耗时")
+    parser.add_argument('--runs', type=int, default=5, help="运行几轮，结果取中位数")
+    parser.add_argument('--cold', action='store_true', help="每轮之前删除jieba的词典缓存")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child()
+        return
+    results = []
+    for _ in range(args.runs):
+        if args.cold:
+            clear_jieba_cache()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(os.environ, PAGE_CACHE_PATH=os.path.join(cache_dir, 'pages.sqlite3'))
+            seed_page_cache(env['PAGE_CACHE_PATH'])
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'], cwd=ROOT, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    for name in ('import_streamlit', 'first_run', 'first_analysis'):
+        values = [result[name] for result in results]
+        print(f"{name:<18}{statistics.median(values) * 1000:10.0f} ms  "
+              f"(最小 {min(values) * 1000:.0f} ms，最大 {max(values) * 1000:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
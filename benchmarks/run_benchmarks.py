@@ -0,0 +1,133 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file run_benchmarks.py
+# 离线基准测试：用 fixtures 里的网页和文本生成 small/medium/huge 三种大小的语料，
+# 分别测量每个阶段和完整流程的耗时，结果可以保存成JSON，和优化前后的结果对比。
+# 用法：python benchmarks/run_benchmarks.py [--sizes small,medium,huge] [--repeat 3] [--out results.json]
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+sys.path.insert(0, ROOT)
+
+import charts
+import html_text
+import jieba_dict
+import segment
+from freq_index import FrequencyIndex
+from keyword_match import KeywordMatcher
+
+# 每种大小把fixture里的段落重复多少次
+SIZES = {'small': 1, 'medium': 700, 'huge': 14000}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def make_corpus(size):
+    '''
+    :param size: 'small'、'medium' 或 'huge'
+    :return: (html字节, txt字节)，段落顺序按固定的随机种子打乱，每次生成的结果一样
+    '''
+    times = SIZES[size]
+    html = load_fixture('small.html')
+    txt = load_fixture('small.txt')
+    if times == 1:
+        return html.encode('utf-8'), txt.encode('utf-8')
+    rng = random.Random(size)
+    paragraphs = txt.strip().split('\n')
+    lines = []
+    for i in range(times):
+        rng.shuffle(paragraphs)
+        lines.extend(paragraphs)
+    body = '\n'.join(lines) + '\n'
+    start = html.index('      <p>')
+    end = html.index('    </div>', start)
+    html = html[:start] + ''.join(f'      <p>{line}</p>\n' for line in lines) + html[end:]
+    return html.encode('utf-8'), body.encode('utf-8')
+
+
+def best_of(func, repeat):
+    '''
+    :return: (最短耗时, 最后一次的返回值)
+    '''
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def render_charts(word_count):
+    # 和页面里一样生成词云和柱状图的配置，不经过streamlit
+    items = word_count.most_common(20)
+    charts.plot_word_cloud(word_count).render_embed()
+    charts.build_chart("柱状图", dict(items)).dump_options_with_quotes()
+
+
+def bench_size(size, repeat):
+    html_bytes, txt_bytes = make_corpus(size)
+    results = {'size': size, 'html_bytes': len(html_bytes), 'txt_bytes': len(txt_bytes), 'stages': {}}
+    stages = results['stages']
+
+    def record(name, func, nbytes=0):
+        # nbytes是这个阶段输入的字节数，为0时不计算吞吐量
+        seconds, value = best_of(func, repeat)
+        stages[name] = {'seconds': seconds, 'bytes': nbytes,
+                        'mb_per_second': nbytes / seconds / 1e6 if nbytes and seconds else None}
+        return value
+
+    raw = record('parse', lambda: html_text.html_to_text(html_bytes, 'utf-8'), len(html_bytes))
+    text = txt_bytes.decode('utf-8')
+    clean = record('clean', lambda: html_text.clean_text(text), len(txt_bytes))
+    words = record('tokenize', lambda: segment.lcut(clean), len(clean.encode('utf-8')))
+    word_count = record('count', lambda: segment.count_words(words), len(clean.encode('utf-8')))
+    stages['tokenize']['tokens'] = len(words)
+    if len(clean) > segment.PARALLEL_THRESHOLD:
+        record('tokenize_parallel', lambda: segment.parallel_count(clean), len(clean.encode('utf-8')))
+    keywords = [word for word, _ in word_count.most_common(50)]
+    lower = raw.lower()
+    record('keyword_match', lambda: KeywordMatcher(keywords).count(lower, lowered=True), len(raw.encode('utf-8')))
+    index = record('freq_index', lambda: FrequencyIndex(word_count))
+    record('freq_range_top20', lambda: index.range(2, index.max_count).most_common(20))
+    record('render', lambda: render_charts(index))
+    # 完整流程：网页字节 -> 词频，上传文件 -> 流式词频
+    record('pipeline_html', lambda: segment.tokenize_and_count(html_text.html_to_clean_text(html_bytes, 'utf-8')),
+           len(html_bytes))
+    record('pipeline_upload_stream',
+           lambda: segment.count_stream(io.BytesIO(txt_bytes), html_text.clean_text), len(txt_bytes))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="分阶段的离线基准测试")
+    parser.add_argument('--sizes', default='small,medium', help="逗号分开的大小：small、medium、huge")
+    parser.add_argument('--repeat', type=int, default=3, help="每个阶段重复几次取最短耗时")
+    parser.add_argument('--out', help="把结果保存成JSON文件")
+    args = parser.parse_args(argv)
+    jieba_dict.load()
+    all_results = []
+    for size in args.sizes.split(','):
+        results = bench_size(size.strip(), args.repeat)
+        all_results.append(results)
+        print(f"== {results['size']}  html {results['html_bytes']} 字节  txt {results['txt_bytes']} 字节")
+        for name, stage in results['stages'].items():
+            speed = f"{stage['mb_per_second']:8.2f} MB/s" if stage['mb_per_second'] is not None else ''
+            print(f"  {name:<24}{stage['seconds'] * 1000:10.2f} ms  {speed}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            json.dump(all_results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file charts.py
+# 生成pyecharts图表对象，不依赖streamlit，页面和基准测试共用
+from pyecharts import options as opts
+from pyecharts.charts import WordCloud, Funnel, Radar, Bar, Line, Pie, Scatter
+from pyecharts.globals import ThemeType
+
+
+def build_chart(chart_type, keyword_counts):
+    '''
+    :param chart_type: 图表类型
+    :param keyword_counts: 关键词和次数的字典
+    :return: pyecharts图表对象，类型不认识时返回None
+    '''
+    if chart_type == "折线图":
+        line_chart=Line()
+        line_chart.add_xaxis(list(keyword_counts.keys()))
+        line_chart.add_yaxis("", list(keyword_counts.values()))
+        line_chart.set_global_opts(
+            xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=-90)),
+            title_opts=opts.TitleOpts(title=""),
+            visualmap_opts=opts.VisualMapOpts(max_=150),
+            toolbox_opts=opts.ToolboxOpts(),)
+        return line_chart
+    elif chart_type == "饼图":
+        pie_chart=Pie()
+        pie_chart.add("", [list(z) for z in zip(keyword_counts.keys(), keyword_counts.values())])
+        pie_chart.set_series_opts(label_opts=opts.LabelOpts(formatter="{b}: {c}"))
+        pie_chart.set_global_opts(title_opts=opts.TitleOpts(title=""), toolbox_opts=opts.ToolboxOpts(),visualmap_opts=opts.VisualMapOpts(max_=150),)
+        return pie_chart
+    elif chart_type == "柱状图":
+        bar_chart=Bar()
+        bar_chart.add_xaxis(list(keyword_counts.keys()))
+        bar_chart.add_yaxis("", list(keyword_counts.values()))
+        bar_chart.set_global_opts(
+                xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=-90)),
+                title_opts=opts.TitleOpts(title=""),
+                visualmap_opts=opts.VisualMapOpts(max_=150),
+                toolbox_opts=opts.ToolboxOpts(),)
+        return bar_chart
+    elif chart_type == "散点图":
+        scatter_chart=Scatter()
+        scatter_chart.add_xaxis(list(keyword_counts.keys()))
+        scatter_chart.add_yaxis("", list(keyword_counts.values()))
+        scatter_chart.set_global_opts(
+                xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=-90)),
+                title_opts=opts.TitleOpts(title=""),
+                visualmap_opts=opts.VisualMapOpts(max_=150),
+                toolbox_opts=opts.ToolboxOpts(),)
+        return scatter_chart
+    elif chart_type == "面积图":
+        # 创建一个 Line 图表对象，使用init_opts参数初始化图表，设置其主题为LIGHT-明亮
+        mianji_chart = Line(init_opts=opts.InitOpts(theme=ThemeType.LIGHT))
+        # 添加X轴数据
+        mianji_chart.add_xaxis(list(keyword_counts.keys()))
+        # 使用list(word_count.values())作为Y轴的数据点，数据线是平滑的，不是折线，在折线下方填充颜色以创建面积图，并设置填充的不透明度为0.5
+        mianji_chart.add_yaxis("Counts", list(keyword_counts.values()), is_smooth=True,
+                               areastyle_opts=opts.AreaStyleOpts(opacity=0.5))
+        mianji_chart.set_global_opts(title_opts=opts.TitleOpts(title="面积图"))
+        return mianji_chart
+    elif chart_type == "雷达图":
+        radar_chart = Radar()
+        radar_chart.add_schema(schema=[opts.RadarIndicatorItem(name=key, max_=150) for key in keyword_counts.keys()])
+        radar_chart.add("", [list(keyword_counts.values())], color="blue")
+        radar_chart.set_global_opts(title_opts=opts.TitleOpts(title="Radar Chart"), toolbox_opts=opts.ToolboxOpts())
+        return radar_chart
+    elif chart_type == "漏斗图":
+        funnel_chart = Funnel()
+        funnel_chart.add("", [list(z) for z in zip(keyword_counts.keys(), keyword_counts.values())])
+        funnel_chart.set_series_opts(label_opts=opts.LabelOpts(formatter="{b}: {c}"))
+        funnel_chart.set_global_opts(title_opts=opts.TitleOpts(title=""), toolbox_opts=opts.ToolboxOpts(),)
+        return funnel_chart
+    return None
+
+
+def plot_word_cloud(word_count, shape='circle'):
+    wordcloud=WordCloud()
+    wordcloud.add("", word_count.most_common(20), word_size_range=[30, 100], shape=shape)
+    wordcloud.set_global_opts(title_opts=opts.TitleOpts(title="词云"))
+    return wordcloud
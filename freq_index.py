@@ -0,0 +1,82 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file freq_index.py
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from operator import itemgetter
+
+
+class FrequencyIndex:
+    '''
+    按次数从大到小排好序的词频索引，词语和次数放在两个平行的数组里。
+    每篇文档只建一次；按次数范围筛选用二分查找，取前k个只是切片。
+    次数相同的词语保持Counter里的先后顺序，和Counter.most_common一致。
+    '''
+
+    def __init__(self, counter):
+        '''
+        :param counter: Counter或者 词语->次数 的字典
+        '''
+        items = sorted(counter.items(), key=itemgetter(1), reverse=True)
+        self.tokens = [token for token, _ in items]
+        self.counts = array('q', (count for _, count in items))
+        # 次数取负以后是从小到大的，可以直接用bisect
+        self._negated = array('q', (-count for count in self.counts))
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @property
+    def max_count(self):
+        return self.counts[0] if self.counts else 0
+
+    def range(self, min_count, max_count):
+        '''
+        :param min_count: 最小次数（包含）
+        :param max_count: 最大次数（包含）
+        :return: 次数在[min_count, max_count]之间的词语视图，不复制数据
+        '''
+        lo = bisect_left(self._negated, -max_count)
+        hi = bisect_right(self._negated, -min_count)
+        return FrequencyView(self, lo, max(lo, hi))
+
+    def all(self):
+        return FrequencyView(self, 0, len(self.tokens))
+
+    def most_common(self, n=None):
+        return self.all().most_common(n)
+
+
+class FrequencyView:
+    '''
+    FrequencyIndex上的一段连续区间，用法和Counter差不多（items、keys、values、most_common）。
+    '''
+
+    def __init__(self, index, lo, hi):
+        self.index = index
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __iter__(self):
+        return islice(self.index.tokens, self.lo, self.hi)
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return islice(self.index.counts, self.lo, self.hi)
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def most_common(self, n=None):
+        '''
+        :param n: 取前几个，None时取全部
+        :return: [(词语, 次数)]，按次数从大到小，只切片不排序
+        '''
+        hi = self.hi if n is None else min(self.hi, self.lo + n)
+        return list(zip(self.index.tokens[self.lo:hi], self.index.counts[self.lo:hi]))
@@ -1,27 +1,56 @@
 # @author xiaoyu
 # @date 2023/12/22
 # @file home.py
-import requests
-from bs4 import BeautifulSoup
+import hashlib
+import io
+import json
+import threading
+import time
+from functools import cached_property
+from itertools import islice
 import re
-from collections import Counter
-import jieba
+from collections import Counter, OrderedDict
 import streamlit as st
-from pyecharts.charts import WordCloud, Funnel, Radar, Bar, Line, Pie, Scatter
-from pyecharts.globals import ThemeType
-from streamlit_echarts import st_pyecharts
-from pyecharts import options as opts
+from keyword_match import KeywordMatcher
+import segment
+from freq_index import FrequencyIndex
+import stage_stats
+from stage_stats import stage
+import jieba_dict
+
+# 图表（pyecharts）、网页解析（lxml）、网络请求（requests）、分词（jieba）、TF-IDF（scipy）
+# 这些比较重的模块都在页面第一次用到时才导入，启动时只导入streamlit和轻量的模块
+
+@st.cache_resource
+def get_page_cache():
+    # 所有会话共用一个网页缓存，脚本重跑时不会重新创建
+    from page_cache import PageCache
+    return PageCache()
+
+@st.cache_resource
+def preload_dictionary():
+    # 服务启动后第一次运行脚本时在后台线程加载jieba词典缓存，用户输入网址的时候就加载好了
+    thread = threading.Thread(target=jieba_dict.load, daemon=True)
+    thread.start()
+    return thread
+
+def extract_page_text(content, encoding):
+    """
+    :param content: 网页的字节内容
+    :param encoding: 响应头里给出的编码，没有时为None
+    :return: 以字符串的形式返回网页中的文本
+    """
+    import html_text
+    with stage('parse', size=len(content)):
+        text = html_text.html_to_text(content, encoding)
+    return text
 
 def getdata_base_text(url):
     """
     :param url: 浏览器地址
-    :return: 以字符串的形式返回一个文本
+    :return: 以字符串的形式返回一个文本（先查网页缓存，过期后用ETag/Last-Modified重新验证）
     """
-    response = requests.get(url)
-    encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else None
-    soup = BeautifulSoup(response.content, 'html.parser', from_encoding=encoding)
-    text = soup.get_text()
-    return text
+    return get_page_cache().get(url, extract_page_text)
 
 def read_txt_file(file_path):
     with open(file_path, 'r') as file:
@@ -29,18 +58,19 @@ def read_txt_file(file_path):
     return text
 
 def download_dict_as_txt_file(data_dict, file_name):
-    with open(file_name, 'w') as file:
-        for key, value in data_dict.items():
-            file.write(f"{key}: {value}\n")
+    # 在内存里拼好文本直接交给下载按钮，不在工作目录写文件，多个用户之间不会互相覆盖
+    buffer = io.StringIO()
+    for key, value in data_dict.items():
+        buffer.write(f"{key}: {value}\n")
     st.download_button(
         label="下载数据",
-        data=open(file_name, 'rb').read(),
+        data=buffer.getvalue().encode('utf-8'),
         file_name=file_name,
         mime="text/plain"
     )
 def ut_get_first_n_indict(dct, n):
-    # 获取字典中前n个键值对
-    first_n_elements = {key: dct[key] for key in list(dct)[:n]}
+    # 获取字典中前n个键值对，只遍历前n个，不把所有键复制成列表
+    first_n_elements = dict(islice(dct.items(), n))
     return first_n_elements
 
 def remove_html_punctuation(text):
@@ -48,33 +78,140 @@ def remove_html_punctuation(text):
     :param text: 需要除去html标签和标点的文本
     :return: 返回清楚好的文本
     '''
-    clean_text1 = re.sub(r'<.*?>', '', text) #利用正侧表达式清除html标签
-    clean_text2 = re.sub(r'[^\w\s]', '', clean_text1)#利用正侧表达式清除标点符号标签
-    clean_text3 = re.sub(r'\s{1,}', ' ', clean_text2)#利用正侧表达式清除一个及以上的空格标签
-    return clean_text3
+    #利用预先编译好的正则清除html标签、标点符号，并把一个及以上的空白合并成一个空格
+    import html_text
+    with stage('clean', size=len(text)):
+        return html_text.clean_text(text)
 
 #分词并统计词频
-def tokenize_and_count(text):
+def tokenize_and_count(text, parallel=None):
     '''
     :param text: 分词并统计词频的文本
+    :param parallel: None时文本较大就自动切块、用多进程分词，结果和串行一样
     :return: 返回Counter类型。里面包含了结果
     '''
-    words = jieba.lcut(text)  #利用jieba分词
-    filtered_words = [word for word in words if 2 <= len(word)]  #清洗字数为1的词语
-    word_count = Counter(filtered_words)#类型转化
-    return word_count
+    return segment.tokenize_and_count(text, parallel)
+
+class DocumentAnalysis:
+    '''
+    一篇文档的分析结果：原文、清洗后的文本、分词列表、词频和小写原文，digest是内容的sha1。
+    只在构造时计算一次，各个页面共用，不要修改里面的内容。
+    '''
+    def __init__(self, raw_text, digest=None):
+        self.raw_text = raw_text
+        self.digest = digest
+        self.clean_text = remove_html_punctuation(raw_text)
+        self.word_count = tokenize_and_count(self.clean_text)
+        self.lower_text = raw_text.lower()
+
+    @classmethod
+    def from_word_count(cls, word_count, digest=None):
+        '''
+        :param word_count: 流式统计出来的词频
+        :param digest: 内容的sha1
+        :return: 只有词频的分析结果，原文、清洗后的文本和小写原文都是None
+        '''
+        analysis = cls.__new__(cls)
+        analysis.raw_text = analysis.clean_text = analysis.lower_text = None
+        analysis.digest = digest
+        analysis.word_count = word_count
+        return analysis
+
+    @cached_property
+    def freq_index(self):
+        # 按次数排好序的词频索引，滑块筛选和取前k个都用它
+        return FrequencyIndex(self.word_count)
+
+    @cached_property
+    def words(self):
+        # 完整的分词列表只有用到时才生成，词频走的是可以并行的路径
+        if self.clean_text is None:
+            return None
+        return segment.lcut(self.clean_text)
+
+@st.cache_resource(max_entries=32)
+def analyse_text(digest, _raw_text):
+    '''
+    :param digest: 文本的sha1，作为缓存的键
+    :param _raw_text: 网页中的文本（以下划线开头，streamlit不对它做哈希）
+    :return: 这段文本的DocumentAnalysis，内容相同只清洗、分词一次
+    '''
+    return DocumentAnalysis(_raw_text, digest)
+
+def analyse_url(url):
+    '''
+    :param url: 浏览器地址
+    :return: 这个网址的DocumentAnalysis。文本每次都从网页缓存取（过期了会重新验证），
+             按文本内容的哈希复用分析结果，网页内容变了才重新清洗、分词
+    '''
+    raw_text = getdata_base_text(url)
+    return analyse_text(hashlib.sha1(raw_text.encode('utf-8')).hexdigest(), raw_text)
+
+@st.cache_resource
+def get_upload_analyses():
+    # 所有会话共用，按上传文件内容的哈希保存分析结果（按最近使用的顺序），各个会话的线程同时读写时用锁保护
+    return OrderedDict(), threading.Lock()
+
+def file_digest(uploaded_file, block_size=segment.BLOCK_SIZE):
+    '''
+    :param uploaded_file: 上传的文件
+    :return: 按块读取计算出的sha1，读完以后回到文件开头。
+             同一次上传（file_id和大小都相同）的哈希记在会话里，重跑脚本时不再把整个文件读一遍
+    '''
+    file_id = getattr(uploaded_file, 'file_id', None)
+    key = (file_id, getattr(uploaded_file, 'size', None))
+    digests = st.session_state.setdefault("upload_digests", {})
+    if file_id is not None and key in digests:
+        return digests[key]
+    sha1 = hashlib.sha1()
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(block_size), b''):
+        sha1.update(block)
+    uploaded_file.seek(0)
+    digest = sha1.hexdigest()
+    if file_id is not None:
+        digests[key] = digest
+        # 只记最近几次上传
+        while len(digests) > 8:
+            del digests[next(iter(digests))]
+    return digest
+
+def analyse_upload(uploaded_file, max_entries=8):
+    '''
+    :param uploaded_file: 上传的文件
+    :param max_entries: 最多保存多少个文件的分析结果
+    :return: 上传文件的DocumentAnalysis（只有词频），内容不变就直接用上一次的结果
+    '''
+    digest = file_digest(uploaded_file)
+    analyses, lock = get_upload_analyses()
+    with lock:
+        analysis = analyses.get(digest)
+        if analysis is not None:
+            analyses.move_to_end(digest)
+    if analysis is None:
+        # 按块读取、清洗、分词，内存占用和文件大小无关
+        size = getattr(uploaded_file, 'size', 0) or 1
+        bar = st.progress(0.0, text="正在分析上传的文件")
+        word_count = segment.count_stream(uploaded_file, remove_html_punctuation,
+                                          progress=lambda done: bar.progress(min(done / size, 1.0), text="正在分析上传的文件"))
+        bar.empty()
+        analysis = DocumentAnalysis.from_word_count(word_count, digest)
+        with lock:
+            analyses[digest] = analysis
+            analyses.move_to_end(digest)
+            # 淘汰最久没用过的
+            while len(analyses) > max_entries:
+                analyses.popitem(last=False)
+    return analysis
 
 def del_key_web_word(url):
     """
     :param text:从一个文本里面得到出现次数最多的
     :return: 以字典的形式返回网站中出现次数前30的关键词
     """
-    # 去除标点符号
-    text=getdata_base_text(url)
-    clead_text=remove_html_punctuation(text)
-    word_count=tokenize_and_count(clead_text)
+    freq_index=analyse_url(url).freq_index
     #取前30个词语
-    top_words = word_count.most_common(30)
+    top_words = freq_index.most_common(30)
     keywords = dict(top_words)
     return keywords
 
@@ -84,96 +221,78 @@ def del_key_self_word(url):
     :param st: streamlit对象st
     :return:
     '''
-    #返回的字典
-    item_counts = {}
     #输入
     key_ower = st.text_input("输入自己需要的关键词(可以以逗号、空格分开)")
     #除去逗号 空格
     items = re.split(r'[,，\s]+', key_ower)
     #过滤掉原始列表 items 中的空字符串元素，并且将每个非空元素两端的空白字符去除
     items = [item.strip() for item in items if item.strip()]
-    #得到原始数据
-    text = getdata_base_text(url)
-    # 遍历列表中的每个元素
-    for item in items:
-        # 使用 count() 方法统计元素在文本中出现的次数，并存储到字典中
-        item_counts[item] = text.lower().count(item.lower())
+    #得到小写的原始数据
+    lower_text = analyse_url(url).lower_text
+    # 用Aho-Corasick自动机扫描一遍文本，统计所有关键词出现的次数（不区分大小写、不重叠）
+    with stage('keyword_match', size=len(lower_text), tokens=len(items)):
+        item_counts = KeywordMatcher(items).count(lower_text, lowered=True)
     return item_counts
 
+def counter_fingerprint(items):
+    '''
+    :param items: 需要画图的(词语, 次数)列表
+    :return: 这些数据的sha1，作为图表缓存的键
+    '''
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+@st.cache_data(max_entries=64)
+def chart_options(fingerprint, chart_type, _items):
+    '''
+    :param fingerprint: 数据的指纹，和图表类型一起作为缓存的键
+    :param chart_type: 图表类型
+    :param _items: (词语, 次数)列表（以下划线开头，streamlit不对它做哈希）
+    :return: echarts的options字典，数据没变就不再重新生成
+    '''
+    from charts import build_chart
+    with stage('render_chart', tokens=len(_items)):
+        chart = build_chart(chart_type, dict(_items))
+        if chart is None:
+            return None
+        return json.loads(chart.dump_options_with_quotes())
+
 def tb_generate(chart_type, keyword_counts):
-    if chart_type == "折线图":
-        line_chart=Line()
-        line_chart.add_xaxis(list(keyword_counts.keys()))
-        line_chart.add_yaxis("", list(keyword_counts.values()))
-        line_chart.set_global_opts(
-            xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=-90)),
-            title_opts=opts.TitleOpts(title=""),
-            visualmap_opts=opts.VisualMapOpts(max_=150),
-            toolbox_opts=opts.ToolboxOpts(),)
-        st_pyecharts(line_chart)
-    elif chart_type == "饼图":
-        pie_chart=Pie()
-        pie_chart.add("", [list(z) for z in zip(keyword_counts.keys(), keyword_counts.values())])
-        pie_chart.set_series_opts(label_opts=opts.LabelOpts(formatter="{b}: {c}"))
-        pie_chart.set_global_opts(title_opts=opts.TitleOpts(title=""), toolbox_opts=opts.ToolboxOpts(),visualmap_opts=opts.VisualMapOpts(max_=150),)
-        st_pyecharts(pie_chart)
-    elif chart_type == "柱状图":
-        bar_chart=Bar()
-        bar_chart.add_xaxis(list(keyword_counts.keys()))
-        bar_chart.add_yaxis("", list(keyword_counts.values()))
-        bar_chart.set_global_opts(
-                xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=-90)),
-                title_opts=opts.TitleOpts(title=""),
-                visualmap_opts=opts.VisualMapOpts(max_=150),
-                toolbox_opts=opts.ToolboxOpts(),)
-        st_pyecharts(bar_chart)
-    elif chart_type == "散点图":
-        scatter_chart=Scatter()
-        scatter_chart.add_xaxis(list(keyword_counts.keys()))
-        scatter_chart.add_yaxis("", list(keyword_counts.values()))
-        scatter_chart.set_global_opts(
-                xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=-90)),
-                title_opts=opts.TitleOpts(title=""),
-                visualmap_opts=opts.VisualMapOpts(max_=150),
-                toolbox_opts=opts.ToolboxOpts(),)
-        st_pyecharts(scatter_chart)
-    elif chart_type == "面积图":
-        # 创建一个 Line 图表对象，使用init_opts参数初始化图表，设置其主题为LIGHT-明亮
-        mianji_chart = Line(init_opts=opts.InitOpts(theme=ThemeType.LIGHT))
-        # 添加X轴数据
-        mianji_chart.add_xaxis(list(keyword_counts.keys()))
-        # 使用list(word_count.values())作为Y轴的数据点，数据线是平滑的，不是折线，在折线下方填充颜色以创建面积图，并设置填充的不透明度为0.5
-        mianji_chart.add_yaxis("Counts", list(keyword_counts.values()), is_smooth=True,
-                               areastyle_opts=opts.AreaStyleOpts(opacity=0.5))
-        mianji_chart.set_global_opts(title_opts=opts.TitleOpts(title="面积图"))
-        st_pyecharts(mianji_chart)
-    elif chart_type == "雷达图":
-        radar_chart = Radar()
-        radar_chart.add_schema(schema=[opts.RadarIndicatorItem(name=key, max_=150) for key in keyword_counts.keys()])
-        radar_chart.add("", [list(keyword_counts.values())], color="blue")
-        radar_chart.set_global_opts(title_opts=opts.TitleOpts(title="Radar Chart"), toolbox_opts=opts.ToolboxOpts())
-        st_pyecharts(radar_chart)
-    elif chart_type == "漏斗图":
-        funnel_chart = Funnel()
-        funnel_chart.add("", [list(z) for z in zip(keyword_counts.keys(), keyword_counts.values())])
-        funnel_chart.set_series_opts(label_opts=opts.LabelOpts(formatter="{b}: {c}"))
-        funnel_chart.set_global_opts(title_opts=opts.TitleOpts(title=""), toolbox_opts=opts.ToolboxOpts(),)
-        st_pyecharts(funnel_chart)
+    items = list(keyword_counts.items())
+    options = chart_options(counter_fingerprint(items), chart_type, items)
+    if options is not None:
+        from streamlit_echarts import st_echarts
+        st_echarts(options=options)
 
 # 绘制词云
-def plot_word_cloud(word_count, shape='circle'):
-    wordcloud=WordCloud()
-    wordcloud.add("", word_count.most_common(20), word_size_range=[30, 100], shape=shape)
-    wordcloud.set_global_opts(title_opts=opts.TitleOpts(title="词云"))
-    return wordcloud
+@st.cache_data(max_entries=64)
+def word_cloud_html(fingerprint, shape, _items):
+    '''
+    :param fingerprint: 数据的指纹，和形状一起作为缓存的键
+    :param shape: 词云形状
+    :param _items: 出现次数最多的(词语, 次数)列表
+    :return: 词云的html字符串，直接在内存里生成，不写文件
+    '''
+    from charts import plot_word_cloud
+    with stage('render_wordcloud', tokens=len(_items)):
+        return plot_word_cloud(Counter(dict(_items)), shape=shape).render_embed()
+
+def show_word_cloud(word_count, shape='circle'):
+    # 在Streamlit中显示词云，同样的数据和形状直接用缓存好的html
+    # word_count是FrequencyIndex/FrequencyView时取前20个只是切片
+    items = word_count.most_common(20)
+    html = word_cloud_html(counter_fingerprint(items), shape, items)
+    st.components.v1.html(html, height=500, width=900, scrolling=True)
 
 #横拉框
-def horizon_pull_frame(counter):
-    max_count = max(counter.values())
+def horizon_pull_frame(freq_index):
+    '''
+    :param freq_index: 文档的FrequencyIndex
+    :return: 次数在滑块范围内的FrequencyView，二分查找得到，不重新构造Counter
+    '''
+    max_count = freq_index.max_count
     min_count = st.sidebar.slider('最小计数值', 0, max_count, 0)
     max_count = st.sidebar.slider('最大计数值', min_count, max_count, max_count)
-    cleaned_counter = Counter({key: value for key, value in counter.items() if min_count <= value <= max_count})
-    return cleaned_counter
+    return freq_index.range(min_count, max_count)
 
 def ciyun():
     st.title("词云绘制示例")
@@ -181,19 +300,12 @@ def ciyun():
     shape_options = ['circle', 'rect', 'roundRect', 'ellipse', 'triangle']
     url = st.text_input("输入网址", "https://www.gov.cn/xinwen/2022-10/25/content_5721685.htm")
     selected_shape = st.selectbox("选择词云形状", shape_options)
-    text = getdata_base_text(url)
-    clear_text=remove_html_punctuation(text)
-    word_count=tokenize_and_count(clear_text)
-    clear_number_text=horizon_pull_frame(word_count)
+    freq_index=analyse_url(url).freq_index
+    clear_number_text=horizon_pull_frame(freq_index)
     if st.button("下载数据"):
         download_dict_as_txt_file(clear_number_text, "data.txt")
     # 绘制词云
-    word_cloud = plot_word_cloud(clear_number_text, shape=selected_shape)
-    # 保存词云为 HTML 文件
-    html_file = "word_cloud.html"
-    word_cloud.render(html_file)
-    # 在Streamlit中显示词云
-    st.components.v1.html(open(html_file, 'r').read(), height=500, width=900, scrolling=True)
+    show_word_cloud(clear_number_text, shape=selected_shape)
 
 def data_analysis():
     # 设置页面标题
@@ -228,30 +340,84 @@ def get_text_self():
     uploaded_file = st.sidebar.file_uploader("选择要上传的txt文件", type="txt")
     chart_type = st.sidebar.selectbox("Select Chart Type", ["折线图", "饼图", "柱状图", "散点图", "面积图", "雷达图", "漏斗图"])
     if uploaded_file is not None:
-        # 读取上传的文件
-        file_contents = uploaded_file.read().decode('utf-8')
+        # 流式读取上传的文件，文件内容不变就直接用上一次的分析结果
+        analysis=analyse_upload(uploaded_file)
     else:
-        file_contents=""
-    clead_text=remove_html_punctuation(file_contents)
-    text=tokenize_and_count(clead_text)
+        analysis=DocumentAnalysis.from_word_count(Counter())
+    text=analysis.word_count
     if st.button("下载数据"):
         download_dict_as_txt_file(text, "data.txt")
     # 绘制词云
-    word_cloud = plot_word_cloud(text)
-    # 保存词云为 HTML 文件
-    html_file = "word_cloud.html"
-    word_cloud.render(html_file)
-    # 在Streamlit中显示词云
-    st.components.v1.html(open(html_file, 'r').read(), height=500, width=900, scrolling=True)
+    show_word_cloud(analysis.freq_index)
     tb_generate(chart_type, text)
 
 
+def get_tfidf_corpus(documents):
+    '''
+    :param documents: {文档的键: Counter}，键里带着内容的哈希，内容变了键也会变
+    :return: 包含这些文档的TfidfCorpus（names是文档的键），和上一次相比只多了文档时只把新文档加进去，
+             有文档去掉了或者内容变了就重新建
+    '''
+    from tfidf import TfidfCorpus
+    corpus = st.session_state.get("tfidf_corpus")
+    if corpus is None or not set(corpus.names) <= set(documents):
+        corpus = TfidfCorpus()
+    known = set(corpus.names)
+    new_names = [name for name in documents if name not in known]
+    if new_names:
+        corpus.add([documents[name] for name in new_names], new_names)
+    st.session_state["tfidf_corpus"] = corpus
+    return corpus
+
+def corpus_keywords():
+    st.title("多文档关键词分析(TF-IDF)")
+    urls_text = st.text_area("输入多个网址，每行一个")
+    uploaded_files = st.sidebar.file_uploader("选择要上传的txt文件", type="txt", accept_multiple_files=True)
+    top_n = st.sidebar.slider("每篇文档的关键词个数", 5, 50, 30)
+    # 文档的键 -> 词频，网址用(网址, 文本的哈希)，上传文件用文件内容的哈希，
+    # 同名的不同文件不会合并，重新上传改过的文件也会用新的内容。网址和上传文件的分析结果都是缓存好的
+    documents = {}
+    labels = {}
+    for url in urls_text.splitlines():
+        if url.strip():
+            analysis = analyse_url(url.strip())
+            key = ('url', url.strip(), analysis.digest)
+            documents[key] = analysis.word_count
+            labels[key] = url.strip()
+    for uploaded_file in uploaded_files or []:
+        analysis = analyse_upload(uploaded_file)
+        key = ('file', analysis.digest)
+        documents[key] = analysis.word_count
+        labels.setdefault(key, uploaded_file.name)
+    if not documents:
+        st.info("请输入网址或者上传txt文件")
+        return
+    corpus = get_tfidf_corpus(documents)
+    rows = [{"文档": labels[key], "关键词": term, "TF-IDF": round(score, 4)}
+            for key, keywords in zip(corpus.names, corpus.top_k(top_n))
+            for term, score in keywords]
+    st.dataframe(rows, use_container_width=True)
+
+
+def show_debug_panel(recorder):
+    # 侧边栏的调试信息：本次运行各阶段的耗时、输入大小、词语数，以及网页缓存的命中情况
+    cache_stats = get_page_cache().stats()
+    with st.sidebar.expander("调试信息"):
+        st.dataframe(recorder.rows(), use_container_width=True)
+        st.json(cache_stats)
+        st.download_button("导出JSON", recorder.to_json(page_cache=cache_stats).encode('utf-8'),
+                           file_name="stages.json", mime="application/json")
+
 def pa_sidebar(wide=None,hige=None):
+    # 每次脚本重跑重新开始记录各阶段的耗时
+    recorder = stage_stats.reset()
+    preload_dictionary()
     #侧边栏标题
     st.sidebar.title("数据")
     #侧边栏选项
-    list_baidu_project=["词云","数据图表","本地数据分析"]
+    list_baidu_project=["词云","数据图表","本地数据分析","多文档关键词"]
     selected_option = st.sidebar.selectbox("",list_baidu_project)
+    start = time.perf_counter()
     # 根据侧边栏选择显示不同的内容
     if selected_option == "词云":
         ciyun()
@@ -259,6 +425,11 @@ def pa_sidebar(wide=None,hige=None):
         data_analysis()
     elif selected_option=="本地数据分析":
         get_text_self()
+    elif selected_option=="多文档关键词":
+        corpus_keywords()
+    recorder.add("page_total", time.perf_counter() - start)
+    if st.sidebar.checkbox("显示调试信息"):
+        show_debug_panel(recorder)
 
 # 运行主函数
 if __name__ == '__main__':
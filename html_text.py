@@ -0,0 +1,74 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file html_text.py
+import re
+
+import lxml.html
+from bs4.dammit import EncodingDetector, UnicodeDammit
+from lxml import etree
+
+# 这些元素里面不是正文，提取文本之前整个去掉（保留元素后面的文字）
+NON_CONTENT_TAGS = ('script', 'style', 'noscript', 'template', 'iframe', 'svg', 'canvas', 'object')
+
+# 预先编译好的正则：标签和标点一次去掉（标点里排除'<'，保证标签先被完整匹配），再合并空白
+_TAG_OR_PUNCTUATION = re.compile(r'<.*?>|[^\w\s<]+|<')
+_SPACES = re.compile(r'\s+')
+
+
+def detect_encoding(content):
+    '''
+    :param content: 网页的字节内容
+    :return: 网页的编码。先看meta里声明的编码，没有声明时能按UTF-8解码就是UTF-8，
+             否则交给bs4的UnicodeDammit猜（lxml自己只会当成Latin-1）
+    '''
+    declared = EncodingDetector.find_declared_encoding(content, is_html=True)
+    if declared:
+        return declared
+    try:
+        content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).original_encoding
+
+
+def _parse(content, encoding):
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    return lxml.html.document_fromstring(content, parser=parser)
+
+
+def html_to_text(content, encoding=None):
+    '''
+    :param content: 网页的字节内容
+    :param encoding: 响应头里给出的编码，没有时用 detect_encoding 判断
+    :return: 网页中的可见文本，已经去掉了script、style等非正文元素
+    '''
+    if not content or not content.strip():
+        return ''
+    try:
+        try:
+            doc = _parse(content, encoding or detect_encoding(content))
+        except LookupError:
+            # 响应头里的编码名不认识，按内容判断
+            doc = _parse(content, detect_encoding(content))
+    except etree.ParserError:
+        # 只有注释、XML声明这样没有任何元素的文档，和bs4一样当作空文本
+        return ''
+    etree.strip_elements(doc, *NON_CONTENT_TAGS, with_tail=False)
+    return doc.text_content()
+
+
+def clean_text(text):
+    '''
+    :param text: 需要除去html标签和标点的文本
+    :return: 去掉标签、标点，连续空白合并成一个空格以后的文本，和原来三次re.sub的结果一样
+    '''
+    return _SPACES.sub(' ', _TAG_OR_PUNCTUATION.sub('', text))
+
+
+def html_to_clean_text(content, encoding=None):
+    '''
+    :param content: 网页的字节内容
+    :param encoding: 响应头里给出的编码
+    :return: 从网页直接得到可以分词的干净文本
+    '''
+    return clean_text(html_to_text(content, encoding))
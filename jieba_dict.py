@@ -0,0 +1,101 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file jieba_dict.py
+# 预先生成的jieba词典缓存。jieba自带的缓存放在系统临时目录（容器重启就没了），
+# 而且是marshal格式，新进程里读取要一秒多；这里把默认词典和自定义词典合并好，
+# 连同停用词一起用pickle保存到 .cache/jieba，启动时直接读进来交给jieba。
+# 自定义词典放在 dict/userdict.txt（格式和 jieba.load_userdict 一样：词语 [词频] [词性]），
+# 停用词放在 dict/stopwords.txt（每行一个）。两个文件都可以没有，内容变了会自动重新生成缓存。
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ROOT, '.cache', 'jieba')
+USER_DICT_PATH = os.path.join(ROOT, 'dict', 'userdict.txt')
+STOPWORDS_PATH = os.path.join(ROOT, 'dict', 'stopwords.txt')
+
+_lock = threading.Lock()
+_stopwords = None
+
+
+def _read_bytes(path):
+    if path is None or not os.path.isfile(path):
+        return b''
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def cache_path(user_dict=USER_DICT_PATH, stopwords=STOPWORDS_PATH, cache_dir=CACHE_DIR):
+    '''
+    :return: 缓存文件的路径，文件名里带着jieba版本和两个文件内容的哈希
+    '''
+    import jieba
+    sha1 = hashlib.sha1(jieba.__version__.encode('utf-8'))
+    for path in (user_dict, stopwords):
+        content = _read_bytes(path)
+        sha1.update(len(content).to_bytes(8, 'little'))
+        sha1.update(content)
+    return os.path.join(cache_dir, f'dict.{sha1.hexdigest()[:16]}.pkl')
+
+
+def read_stopwords(path=STOPWORDS_PATH):
+    '''
+    :return: 停用词集合，文件不存在时是空集合
+    '''
+    lines = _read_bytes(path).decode('utf-8-sig').splitlines()
+    return frozenset(line.strip() for line in lines if line.strip())
+
+
+def build(user_dict=USER_DICT_PATH, stopwords=STOPWORDS_PATH, cache_dir=CACHE_DIR):
+    '''
+    生成词典缓存并保存，只在第一次或者自定义词典、停用词变了的时候需要
+    :return: {'freq': 前缀词典, 'total': 总词频, 'stopwords': 停用词集合}
+    '''
+    import jieba
+    tokenizer = jieba.Tokenizer()
+    tokenizer.FREQ, tokenizer.total = tokenizer.gen_pfdict(tokenizer.get_dict_file())
+    tokenizer.initialized = True
+    if user_dict is not None and os.path.isfile(user_dict):
+        # 没写词频的词语由jieba按默认词典估算，和运行时调用load_userdict的结果一样
+        tokenizer.load_userdict(user_dict)
+    data = {'freq': tokenizer.FREQ, 'total': tokenizer.total, 'stopwords': read_stopwords(stopwords)}
+    path = cache_path(user_dict, stopwords, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 先写临时文件再替换，多个进程同时生成也不会读到写了一半的缓存
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir)
+    with os.fdopen(fd, 'wb') as file:
+        pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+    return data
+
+
+def load(user_dict=USER_DICT_PATH, stopwords=STOPWORDS_PATH, cache_dir=CACHE_DIR):
+    '''
+    把缓存的词典设置给jieba的默认分词器（没有缓存时先生成），每个进程只加载一次
+    :return: 停用词集合
+    '''
+    global _stopwords
+    if _stopwords is not None:
+        return _stopwords
+    with _lock:
+        if _stopwords is None:
+            import jieba
+            try:
+                with open(cache_path(user_dict, stopwords, cache_dir), 'rb') as file:
+                    data = pickle.load(file)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                data = build(user_dict, stopwords, cache_dir)
+            with jieba.dt.lock:
+                jieba.dt.FREQ, jieba.dt.total = data['freq'], data['total']
+                jieba.dt.initialized = True
+            _stopwords = data['stopwords']
+    return _stopwords
+
+
+if __name__ == '__main__':
+    # 部署时（比如构建镜像时）先生成好缓存：python jieba_dict.py
+    build()
+    print(cache_path())
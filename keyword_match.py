@@ -0,0 +1,137 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file keyword_match.py
+import re
+from collections import deque
+
+
+class KeywordMatcher:
+    '''
+    Aho–Corasick多关键词匹配：关键词列表只建一次自动机，扫描一遍文本就能统计出所有关键词的次数。
+    默认不区分大小写，和 text.lower().count(item.lower()) 的结果一致。
+    '''
+
+    def __init__(self, keywords, ignore_case=True):
+        '''
+        :param keywords: 关键词列表
+        :param ignore_case: 是否忽略大小写
+        '''
+        self.keywords = list(keywords)
+        self.ignore_case = ignore_case
+        # 大小写归一以后相同的关键词共用一个模式
+        self._patterns = []
+        self._pattern_of = {}
+        for keyword in self.keywords:
+            pattern = keyword.lower() if ignore_case else keyword
+            if pattern and pattern not in self._pattern_of:
+                self._pattern_of[pattern] = len(self._patterns)
+                self._patterns.append(pattern)
+        self._build()
+
+    def _build(self):
+        # 字典树：goto[状态][字符] -> 下一个状态，out[状态]是在这里结束的模式编号
+        goto = [{}]
+        out = [()]
+        for pid, pattern in enumerate(self._patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] = out[state] + (pid,)
+        # 按层次遍历求失败指针，并把失败指针上的输出合并进来
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._lengths = [len(pattern) for pattern in self._patterns]
+        # 回到根状态时用正则直接跳到下一个可能开始匹配的字符，跳过的部分在C里完成
+        if goto[0]:
+            self._first_search = re.compile('[' + ''.join(re.escape(ch) for ch in goto[0]) + ']').search
+        else:
+            self._first_search = None
+
+    def count(self, text, overlapping=False, lowered=False):
+        '''
+        :param text: 需要统计的文本
+        :param overlapping: True时统计所有出现（可以重叠），False时每个关键词单独按不重叠计数，和str.count一致
+        :param lowered: 文本是否已经转成小写，已经转过就不再转一次
+        :return: 字典，键是传入的关键词，值是出现次数
+        '''
+        if self.ignore_case and not lowered:
+            text = text.lower()
+        counts = [0] * len(self._patterns)
+        if self._first_search is not None:
+            self._scan(text, counts, overlapping)
+        result = {}
+        for keyword in self.keywords:
+            pid = self._pattern_of.get(keyword.lower() if self.ignore_case else keyword)
+            result[keyword] = 0 if pid is None else counts[pid]
+        return result
+
+    def _scan(self, text, counts, overlapping):
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        root = goto[0]
+        first_search = self._first_search
+        lengths = self._lengths
+        # 不重叠模式下记录每个模式上一次计数结束的位置
+        last_end = None if overlapping else [0] * len(self._patterns)
+        state = 0
+        i = 0
+        n = len(text)
+        while i < n:
+            if state == 0:
+                m = first_search(text, i)
+                if m is None:
+                    break
+                i = m.start()
+                state = root[text[i]]
+            else:
+                ch = text[i]
+                while True:
+                    nxt = goto[state].get(ch)
+                    if nxt is not None:
+                        state = nxt
+                        break
+                    if state == 0:
+                        break
+                    state = fail[state]
+            matched = out[state]
+            if matched:
+                if last_end is None:
+                    for pid in matched:
+                        counts[pid] += 1
+                else:
+                    for pid in matched:
+                        if i + 1 - lengths[pid] >= last_end[pid]:
+                            counts[pid] += 1
+                            last_end[pid] = i + 1
+            i += 1
+
+
+def count_keywords(text, keywords, overlapping=False, lowered=False):
+    '''
+    :param text: 需要统计的文本
+    :param keywords: 关键词列表
+    :param overlapping: 是否统计重叠的出现
+    :param lowered: 文本是否已经是小写
+    :return: 字典，键是关键词，值是不区分大小写的出现次数
+    '''
+    return KeywordMatcher(keywords).count(text, overlapping=overlapping, lowered=lowered)
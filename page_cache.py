@@ -0,0 +1,210 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file page_cache.py
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+import requests
+
+from stage_stats import stage
+
+# 默认缓存位置：项目目录下的 .cache/pages.sqlite3，多个会话、多个进程共用；可以用环境变量 PAGE_CACHE_PATH 换到别处
+DEFAULT_CACHE_PATH = (os.environ.get('PAGE_CACHE_PATH')
+                      or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pages.sqlite3'))
+# 表结构改了就加一，打开旧的缓存文件时重建
+SCHEMA_VERSION = 2
+
+
+class PageCache:
+    '''
+    按url缓存网页。
+    两层结构：进程内的LRU字典（保存提取好的文本）+ 磁盘上的sqlite（保存原始的响应字节，按字节数限制大小的LRU）。
+    磁盘上存的是原始内容，换了提取函数或者提取函数改了实现，读的时候重新提取，不会拿到旧的文本。
+    在ttl秒之内直接返回缓存；过期以后带上ETag/Last-Modified做条件请求，页面没变只花一次304。
+    重新验证时服务器出错或者连不上，继续用旧的内容。
+    '''
+
+    # 内存命中时最多隔这么多秒更新一次磁盘上的访问时间，让磁盘的LRU也知道哪些页面常用
+    touch_interval = 60
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=64 * 1024 * 1024, ttl=600, memory_entries=128, session=None,
+                 timeout=10, stale_retry=60):
+        '''
+        :param path: sqlite缓存文件路径
+        :param max_bytes: 磁盘缓存中响应内容的总字节数上限，超过后按最近访问时间淘汰
+        :param ttl: 缓存有效秒数，过期后重新验证
+        :param memory_entries: 进程内缓存的最大条数
+        :param session: requests.Session，可以自己传入（测试时换成本地服务）
+        :param timeout: 请求的超时秒数，服务器卡住时最多等这么久就用旧的内容
+        :param stale_retry: 出错后用旧的内容时，隔多少秒再去重新验证，不让每次重跑都卡在出问题的服务器上
+        '''
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.stale_retry = stale_retry
+        self._memory = OrderedDict()  # (url, 提取函数名) -> [text, fetched_at, touched_at]
+        self._lock = threading.Lock()
+        self._ready = False
+        self._stats = {'hits': 0, 'misses': 0, 'revalidations': 0, 'stale': 0, 'evictions': 0}
+
+    def get(self, url, extract):
+        '''
+        :param url: 浏览器地址
+        :param extract: 提取文本的函数 extract(content, encoding)，content是响应的字节，
+                        encoding是响应头里给出的编码（没有时为None）
+        :return: 提取好的文本。没有缓存时请求失败会抛出requests的异常
+        '''
+        now = time.time()
+        key = (url, f'{extract.__module__}.{extract.__qualname__}')
+        touch = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self._stats['hits'] += 1
+                if now - entry[2] >= self.touch_interval:
+                    entry[2] = now
+                    touch = True
+                text = entry[0]
+            else:
+                entry = None
+        if entry is not None:
+            if touch:
+                self._touch(url, now)
+            return text
+        row = self._load(url)
+        if row is not None and now - row[4] < self.ttl:
+            self._touch(url, now)
+            self._count('hits')
+            return self._extract(key, row[0], row[1], extract, row[4], now)
+        # 过期或者没有缓存，带上条件请求头去请求
+        headers = {}
+        if row is not None:
+            if row[2]:
+                headers['If-None-Match'] = row[2]
+            if row[3]:
+                headers['If-Modified-Since'] = row[3]
+        try:
+            with stage('network') as counts:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                counts['size'] = len(response.content)
+        except requests.RequestException:
+            if row is None:
+                raise
+            response = None
+        if row is not None and response is not None and response.status_code == 304:
+            self._refresh(url, now, now)
+            self._count('revalidations')
+            return self._extract(key, row[0], row[1], extract, now, now)
+        if row is not None and (response is None or not response.ok):
+            # 重新验证时出错，用旧的内容；把获取时间往后推，stale_retry秒之后再去重新验证
+            fetched_at = max(row[4], now - self.ttl + self.stale_retry)
+            self._refresh(url, fetched_at, now)
+            self._count('stale')
+            return self._extract(key, row[0], row[1], extract, fetched_at, now)
+        response.raise_for_status()
+        self._count('misses')
+        encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else None
+        self._store(url, response.content, encoding, response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'), now)
+        return self._extract(key, response.content, encoding, extract, now, now)
+
+    def stats(self):
+        '''
+        :return: 命中、未命中、304重新验证、出错时用旧内容、淘汰的次数，以及磁盘缓存的条数和字节数
+        '''
+        with self._lock:
+            stats = dict(self._stats)
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages').fetchone()
+        stats['entries'] = entries
+        stats['bytes'] = size
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM pages')
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                # 旧版本保存的是提取好的文本，不知道是哪个提取函数得到的，直接丢掉
+                conn.execute('DROP TABLE IF EXISTS pages')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS pages ('
+                'url TEXT PRIMARY KEY, content BLOB NOT NULL, encoding TEXT, etag TEXT, last_modified TEXT, '
+                'fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _extract(self, key, content, encoding, extract, fetched_at, now):
+        # 提取文本并放进内存缓存
+        text = extract(content, encoding)
+        with self._lock:
+            self._memory[key] = [text, fetched_at, now]
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return text
+
+    def _load(self, url):
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                'SELECT content, encoding, etag, last_modified, fetched_at FROM pages WHERE url = ?',
+                (url,)).fetchone()
+
+    def _touch(self, url, now):
+        with closing(self._connect()) as conn, conn:
+            conn.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (now, url))
+
+    def _refresh(self, url, fetched_at, now):
+        with closing(self._connect()) as conn, conn:
+            conn.execute('UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?', (fetched_at, now, url))
+
+    def _store(self, url, content, encoding, etag, last_modified, now):
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO pages '
+                '(url, content, encoding, etag, last_modified, fetched_at, accessed_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (url, content, encoding, etag, last_modified, now, now, size))
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # 按最近访问时间从旧到新淘汰，直到总大小回到上限以内
+            evicted = []
+            for old_url, old_size in conn.execute('SELECT url, size FROM pages ORDER BY accessed_at'):
+                if total <= self.max_bytes:
+                    break
+                if old_url == url:
+                    continue
+                evicted.append((old_url,))
+                total -= old_size
+            conn.executemany('DELETE FROM pages WHERE url = ?', evicted)
+        evicted_urls = {old_url for (old_url,) in evicted}
+        with self._lock:
+            for key in [key for key in self._memory if key[0] in evicted_urls]:
+                del self._memory[key]
+            self._stats['evictions'] += len(evicted)
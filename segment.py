@@ -0,0 +1,178 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file segment.py
+import codecs
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import jieba_dict
+from stage_stats import stage
+
+# 文本超过这么多字符时自动切块并行分词
+PARALLEL_THRESHOLD = 500000
+# 每一块大约的字符数
+CHUNK_SIZE = 200000
+# 流式读取文件时每次读的字节数
+BLOCK_SIZE = 1 << 20
+# 流式读取时一行超过这么多字符还没有换行，就强制切开处理，内存不会随着文件变大
+MAX_PENDING = 1 << 20
+
+# jieba 只会在 [一-鿕a-zA-Z0-9+#&._%-] 组成的片段里面组词，空白和中文句末标点一定是分界，
+# 在这些字符后面切块，每一块分出来的词和整篇一起分完全一样
+_BOUNDARY_CHARS = ' \n\t\r　。！？；'
+_BOUNDARY = re.compile(r'[\s。！？；]')
+
+_pool = None
+
+
+def count_words(words):
+    '''
+    :param words: 分好的词语列表
+    :return: 返回Counter类型，去掉了字数为1的词语和停用词
+    '''
+    stopwords = jieba_dict.load()
+    filtered_words = [word for word in words if 2 <= len(word) and word not in stopwords]  #清洗字数为1的词语和停用词
+    word_count = Counter(filtered_words)#类型转化
+    return word_count
+
+
+def split_chunks(text, chunk_size=CHUNK_SIZE):
+    '''
+    :param text: 需要切块的文本
+    :param chunk_size: 每块大约的字符数
+    :return: 文本块列表，只在空白或句末标点后面切，拼起来就是原文
+    '''
+    chunks = []
+    start = 0
+    n = len(text)
+    while n - start > chunk_size:
+        end = start + chunk_size
+        # 先往前找最近的分界字符
+        cut = max(text.rfind(ch, start, end) for ch in _BOUNDARY_CHARS)
+        if cut < 0:
+            # 这一段里面没有分界，就往后找
+            m = _BOUNDARY.search(text, end)
+            if m is None:
+                break
+            cut = m.start()
+        chunks.append(text[start:cut + 1])
+        start = cut + 1
+    if start < n or not chunks:
+        chunks.append(text[start:])
+    return chunks
+
+
+def lcut(text):
+    '''
+    :param text: 需要分词的文本
+    :return: 词语列表。第一次调用时才导入jieba并加载词典缓存
+    '''
+    jieba_dict.load()
+    import jieba
+    return jieba.lcut(text)
+
+
+def init_worker():
+    # 每个工作进程启动时加载一次词典缓存（包括自定义词典和停用词）
+    jieba_dict.load()
+
+
+def _count_chunk(chunk):
+    return count_words(lcut(chunk))
+
+
+def get_pool():
+    '''
+    :return: 进程池，第一次用到时创建，之后一直复用
+    '''
+    global _pool
+    if _pool is None:
+        # 用spawn启动，避免在streamlit这种多线程进程里fork
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                    mp_context=multiprocessing.get_context('spawn'),
+                                    initializer=init_worker)
+    return _pool
+
+
+def parallel_count(text, chunk_size=CHUNK_SIZE):
+    '''
+    :param text: 需要分词统计的文本
+    :param chunk_size: 每块大约的字符数
+    :return: Counter，和串行 count_words(lcut(text)) 的结果（包括顺序）完全一样
+    '''
+    chunks = split_chunks(text, chunk_size)
+    if len(chunks) == 1:
+        return _count_chunk(chunks[0])
+    word_count = Counter()
+    # map按顺序返回，按块的顺序合并，词语第一次出现的先后和串行一致
+    for chunk_count in get_pool().map(_count_chunk, chunks):
+        word_count.update(chunk_count)
+    return word_count
+
+
+def tokenize_and_count(text, parallel=None):
+    '''
+    :param text: 分词并统计词频的文本
+    :param parallel: None时按文本长度自动决定，True/False强制并行或串行
+    :return: 返回Counter类型。里面包含了结果
+    '''
+    if parallel is None:
+        parallel = len(text) > PARALLEL_THRESHOLD and (os.cpu_count() or 1) > 1
+    if parallel:
+        with stage('tokenize_parallel', size=len(text)) as counts:
+            word_count = parallel_count(text)
+            counts['tokens'] = sum(word_count.values())
+        return word_count
+    with stage('tokenize', size=len(text)) as counts:
+        words = lcut(text)  #利用jieba分词
+        counts['tokens'] = len(words)
+    with stage('count', tokens=len(words)):
+        return count_words(words)
+
+
+def count_stream(stream, clean, block_size=BLOCK_SIZE, progress=None, encoding='utf-8', max_pending=MAX_PENDING):
+    '''
+    :param stream: 二进制文件对象，按块读取，不会一次读进内存
+    :param clean: 清洗函数，比如 remove_html_punctuation
+    :param block_size: 每次读取的字节数
+    :param progress: 进度回调，参数是已经读取的字节数
+    :param encoding: 文件编码
+    :param max_pending: 没有换行时最多积累的字符数，超过后先在空白处切开，没有空白就直接切开
+    :return: Counter。有换行或空白可以切的文件，和整个文件读进来再清洗、分词的结果一样；
+             很长又没有空白的一行（比如抓取下来的整段中文）是硬切开的，
+             切口处的一两个词可能和整篇一起分词时不同，换来的是内存不随文件大小增长
+    '''
+    decoder = codecs.getincrementaldecoder(encoding)()
+    word_count = Counter()
+    pending = ''
+    done = 0
+    while True:
+        block = stream.read(block_size)
+        final = not block
+        # 增量解码，被块边界切开的多字节字符留到下一块
+        pending += decoder.decode(block, final=final)
+        if final:
+            text, pending = pending, ''
+        else:
+            # 在换行处切开：清洗用的正则都不跨行，分词也一定在空白处断开
+            cut = pending.rfind('\n')
+            if cut < 0 and len(pending) > max_pending:
+                # 很长的一行没有换行，只好在空白处切开（标点会被清洗掉，不能作为分界）
+                cut = max(pending.rfind(ch) for ch in ' \t\r\u3000')
+                if cut < 0:
+                    # 连空白都没有，直接切开，结果是近似的
+                    cut = len(pending) - 1
+            if cut < 0:
+                text = ''
+            else:
+                text, pending = pending[:cut + 1], pending[cut + 1:]
+        if text:
+            word_count.update(tokenize_and_count(clean(text)))
+        done += len(block)
+        if progress is not None:
+            progress(done)
+        if final:
+            return word_count
@@ -0,0 +1,72 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file stage_stats.py
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# 每个线程（streamlit里每个会话的脚本在自己的线程里运行）单独记录
+_local = threading.local()
+
+
+class StageRecorder:
+    '''
+    按阶段累计耗时、调用次数、输入大小和词语数。
+    输入大小在网络、解析阶段是字节数，在清洗、分词等文本阶段是字符数。
+    '''
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, name, seconds, size=0, tokens=0):
+        stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'size': 0, 'tokens': 0})
+        stage['calls'] += 1
+        stage['seconds'] += seconds
+        stage['size'] += size
+        stage['tokens'] += tokens
+
+    def rows(self):
+        '''
+        :return: [{'stage': 阶段, 'calls':..., 'seconds':..., 'size':..., 'tokens':...}]，按耗时从大到小
+        '''
+        rows = [dict(stage=name, **values) for name, values in self.stages.items()]
+        rows.sort(key=lambda row: row['seconds'], reverse=True)
+        return rows
+
+    def to_json(self, **extra):
+        return json.dumps({'stages': self.rows(), **extra}, ensure_ascii=False, indent=2)
+
+
+def current():
+    '''
+    :return: 当前线程的StageRecorder
+    '''
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        recorder = _local.recorder = StageRecorder()
+    return recorder
+
+
+def reset():
+    '''
+    开始新的一次记录（比如每次脚本重跑的开头），返回新的StageRecorder
+    '''
+    _local.recorder = StageRecorder()
+    return _local.recorder
+
+
+@contextmanager
+def stage(name, size=0, tokens=0):
+    '''
+    记录一个阶段的耗时。输入大小、词语数在结束前才知道时，可以写到 yield 出来的字典里：
+        with stage('tokenize') as counts:
+            words = jieba.lcut(text)
+            counts['tokens'] = len(words)
+    '''
+    counts = {'size': size, 'tokens': tokens}
+    start = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        current().add(name, time.perf_counter() - start, counts['size'], counts['tokens'])
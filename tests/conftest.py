@@ -0,0 +1,8 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file conftest.py
+import os
+import sys
+
+# 测试直接导入项目根目录下的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
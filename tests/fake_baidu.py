@@ -0,0 +1,60 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file fake_baidu.py
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+
+class FakeBaidu:
+    '''
+    代替gopup的假模块，传给 BaiduIndexStore(backend=...)。
+    每次请求睡latency秒；数据只发布到lag天以前；failures里的关键词前几次请求抛出异常。
+    '''
+
+    def __init__(self, latency=0.0, lag=2, failures=None, today=None):
+        self.latency = latency
+        self.today = today or date.today()
+        self.lag = lag
+        self.failures = dict(failures or {})
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _series(self, word, start_date, end_date, cookie):
+        with self._lock:
+            self.calls.append((word, start_date, end_date))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            with self._lock:
+                if self.failures.get(word, 0) > 0:
+                    self.failures[word] -= 1
+                    raise ConnectionError(f"fake failure for {word}")
+            last = min(end_date, self.today - timedelta(days=self.lag))
+            rows = []
+            day = start_date
+            while day <= last:
+                rows.append({'date': day.isoformat(), 'keyword': word, 'index': expected_index(word, day)})
+                day += timedelta(days=1)
+            return pd.DataFrame(rows, columns=['date', 'keyword', 'index'])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    baidu_search_index = _series
+    baidu_info_index = _series
+    baidu_media_index = _series
+
+    def baidu_age_index(self, word, cookie):
+        with self._lock:
+            self.calls.append((word, 'age'))
+        return pd.DataFrame({'desc': ['0-19', '20-29'], 'rate': [40.0, 60.0]})
+
+
+def expected_index(word, day):
+    return sum(map(ord, word)) + day.toordinal() % 100
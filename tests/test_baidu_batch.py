@@ -0,0 +1,93 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_baidu_batch.py
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from baidu_batch import TokenBucket, call_with_retry, compare_keywords, to_wide
+from baidu_store import BaiduIndexStore
+from fake_baidu import FakeBaidu
+
+START = date.today() - timedelta(days=20)
+END = date.today() - timedelta(days=5)
+WORDS = [f'w{i}' for i in range(6)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BaiduIndexStore(path=str(tmp_path / 'baidu.sqlite3'), backend=FakeBaidu(latency=0.05))
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # 前两个不用等，后面四个每个要等1/20秒
+    assert time.monotonic() - start >= 4 / 20 * 0.9
+
+
+def test_call_with_retry():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError('fail')
+        return 'ok'
+
+    assert call_with_retry(flaky, retries=3, backoff=0.001) == 'ok'
+    assert len(attempts) == 3
+    attempts.clear()
+    with pytest.raises(ConnectionError):
+        call_with_retry(flaky, retries=1, backoff=0.001)
+    assert len(attempts) == 2
+
+
+def test_to_wide_follows_word_order():
+    frames = {word: pd.DataFrame({'date': ['2024-01-01', '2024-01-02'], 'index': [i, i + 1]})
+              for i, word in enumerate(['w2', 'w0', 'w1'])}
+    frames['empty'] = pd.DataFrame()
+    wide = to_wide(frames, words=['w0', 'w1', 'w2', 'empty', 'missing'])
+    assert list(wide.columns) == ['w0', 'w1', 'w2']
+    assert wide['w2'].tolist() == [0, 1]
+    assert list(to_wide(frames).columns) == ['w2', 'w0', 'w1']
+    assert to_wide({}).empty
+
+
+def test_compare_keywords(store):
+    seen = []
+    start = time.monotonic()
+    frames, errors = compare_keywords(store, 'search', WORDS, START, END, 'cookie', max_workers=3,
+                                      rate=1000, burst=10,
+                                      on_result=lambda word, df, error: seen.append((word, error)))
+    elapsed = time.monotonic() - start
+    assert list(frames) == WORDS and not errors
+    assert sorted(word for word, _ in seen) == WORDS
+    assert all(len(df) == (END - START).days + 1 for df in frames.values())
+    # 6个关键词，3个线程，每个请求0.05秒：并发执行，不超过线程数
+    assert store.backend.max_active == 3
+    assert elapsed < 6 * 0.05
+    assert list(to_wide(frames, words=WORDS).columns) == WORDS
+    # 第二次全部从本地读
+    compare_keywords(store, 'search', WORDS, START, END, 'cookie')
+    assert store.fetches == len(WORDS)
+
+
+def test_compare_keywords_rate_limit(store):
+    store.backend.latency = 0
+    start = time.monotonic()
+    compare_keywords(store, 'search', WORDS, START, END, 'cookie', max_workers=6, rate=20, burst=1)
+    assert time.monotonic() - start >= 5 / 20 * 0.9
+
+
+def test_compare_keywords_retries_and_errors(store):
+    store.backend.failures = {'w1': 1, 'w3': 10}
+    frames, errors = compare_keywords(store, 'search', WORDS, START, END, 'cookie', rate=1000, burst=10,
+                                      retries=2, backoff=0.001)
+    assert list(frames) == ['w0', 'w1', 'w2', 'w4', 'w5']
+    assert list(errors) == ['w3'] and isinstance(errors['w3'], ConnectionError)
+    assert sum(call[0] == 'w3' for call in store.backend.calls) == 3
@@ -0,0 +1,96 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_baidu_store.py
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from baidu_store import BaiduIndexStore, missing_ranges
+from fake_baidu import FakeBaidu, expected_index
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BaiduIndexStore(path=str(tmp_path / 'baidu.sqlite3'), backend=FakeBaidu())
+
+
+def test_missing_ranges():
+    d = date(2024, 1, 1)
+    have = {d + timedelta(days=2), d + timedelta(days=3), d + timedelta(days=6)}
+    assert missing_ranges(d, d + timedelta(days=7), have) == [
+        (d, d + timedelta(days=1)), (d + timedelta(days=4), d + timedelta(days=5)),
+        (d + timedelta(days=7), d + timedelta(days=7))]
+    assert missing_ranges(d, d, {d}) == []
+
+
+def test_fetches_only_missing_days(store):
+    start = TODAY - timedelta(days=30)
+    df = store.query('search', '经济', start, TODAY - timedelta(days=20), 'cookie')
+    assert len(df) == 11
+    assert store.fetches == 1
+    # 前面已经有了，只请求后面缺的一段
+    df = store.query('search', '经济', start, TODAY - timedelta(days=10), 'cookie')
+    assert store.backend.calls[-1][1:] == (TODAY - timedelta(days=19), TODAY - timedelta(days=10))
+    assert len(df) == 21
+    assert df['date'].is_monotonic_increasing
+    assert df['index'].tolist() == [expected_index('经济', start + timedelta(days=i)) for i in range(21)]
+    store.query('search', '经济', start, TODAY - timedelta(days=10), 'cookie')
+    assert store.fetches == 2
+
+
+def test_unpublished_days_are_fetched_again(store):
+    # 数据只发布到两天前，最近两天和今天不能当成空的保存
+    start = TODAY - timedelta(days=10)
+    assert len(store.query('search', '改革', start, TODAY, 'cookie')) == 9
+    store.backend.lag = 0
+    df = store.query('search', '改革', start, TODAY, 'cookie')
+    assert store.backend.calls[-1][1:] == (TODAY - timedelta(days=1), TODAY)
+    assert len(df) == 11
+    # 今天的数据也不保存
+    store.query('search', '改革', start, TODAY, 'cookie')
+    assert store.backend.calls[-1][1:] == (TODAY, TODAY)
+
+
+def test_failed_fetch_not_stored(store):
+    store.backend.failures['发展'] = 1
+    with pytest.raises(ConnectionError):
+        store.query('search', '发展', TODAY - timedelta(days=5), TODAY - timedelta(days=3), 'cookie')
+    assert len(store.query('search', '发展', TODAY - timedelta(days=5), TODAY - timedelta(days=3), 'cookie')) == 3
+
+
+def test_undated_result_keeps_stored_rows(store, monkeypatch):
+    start = TODAY - timedelta(days=10)
+    store.query('search', '经济', start, start + timedelta(days=2), 'cookie')
+    monkeypatch.setattr(store.backend, 'baidu_search_index',
+                        lambda word, s, e, cookie: pd.DataFrame({'keyword': [word], 'index': [1]}), raising=False)
+    df = store.query('search', '经济', start, start + timedelta(days=4), 'cookie')
+    assert len(df) == 4
+    assert df['date'].notna().sum() == 3
+
+
+def test_portrait_ttl(store):
+    assert len(store.portrait('age', '经济', 'cookie')) == 2
+    assert len(store.portrait('age', '经济', 'cookie')) == 2
+    assert store.fetches == 1
+    store.portrait_ttl = 0
+    store.portrait('age', '经济', 'cookie')
+    assert store.fetches == 2
+    with pytest.raises(ValueError):
+        store.portrait('height', '经济', 'cookie')
+
+
+def test_empty_answer_stored_for_older_days(store):
+    # 这个词一直没有数据：早于publish_delay天的日期保存成空的，最近几天下次还要请求
+    store.backend.lag = 100
+    start = TODAY - timedelta(days=30)
+    assert len(store.query('search', '冷门', start, TODAY - timedelta(days=1), 'cookie')) == 0
+    assert len(store.query('search', '冷门', start, TODAY - timedelta(days=1), 'cookie')) == 0
+    assert store.backend.calls[-1][1:] == (TODAY - timedelta(days=store.publish_delay - 1), TODAY - timedelta(days=1))
+    assert store.fetches == 2
+    # 整段都在最近几天里，什么都不保存
+    store.query('search', '冷门', TODAY - timedelta(days=2), TODAY - timedelta(days=1), 'cookie')
+    store.query('search', '冷门', TODAY - timedelta(days=2), TODAY - timedelta(days=1), 'cookie')
+    assert store.fetches == 4
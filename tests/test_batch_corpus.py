@@ -0,0 +1,150 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_batch_corpus.py
+import asyncio
+import http.server
+import json
+import os
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import batch_corpus
+import html_text
+import segment
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+class FixtureServer:
+    '''
+    提供fixture网页的本地服务，每个请求睡一会儿，记录每个主机（Host头）同时进行的请求数
+    '''
+
+    def __init__(self, delay=0.05):
+        with open(os.path.join(FIXTURES, 'small.html'), 'rb') as file:
+            self.page = file.read()
+        self.active = defaultdict(int)
+        self.max_active = defaultdict(int)
+        lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                host = self.headers.get('Host')
+                with lock:
+                    server.active[host] += 1
+                    server.max_active[host] = max(server.max_active[host], server.active[host])
+                try:
+                    time.sleep(delay)
+                    if self.path.startswith('/missing'):
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.end_headers()
+                    self.wfile.write(server.page)
+                finally:
+                    with lock:
+                        server.active[host] -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_port
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def free_port():
+    # 一个没有服务在监听的端口，连接会被拒绝
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_pipeline(tmp_path):
+    server = FixtureServer()
+    try:
+        # 127.0.0.1 和 localhost 是两个主机，各自限制同时请求数
+        urls = [f'http://{host}:{server.port}/page{i}' for host in ('127.0.0.1', 'localhost') for i in range(8)]
+        bad = [f'http://127.0.0.1:{server.port}/missing', f'http://127.0.0.1:{free_port()}/refused']
+        stats = asyncio.run(batch_corpus.run_pipeline(urls + bad, str(tmp_path), concurrency=8, per_host=3,
+                                                      workers=1, timeout=10))
+    finally:
+        server.close()
+    assert stats['pages'] == len(urls) and stats['failed'] == 2
+    assert max(server.max_active.values()) == 3
+    assert len(server.max_active) == 2
+    with open(tmp_path / 'counts.jsonl', encoding='utf-8') as file:
+        lines = [json.loads(line) for line in file]
+    assert sorted(line['url'] for line in lines) == sorted(urls + bad)
+    errors = {line['url']: line['error'] for line in lines if 'error' in line}
+    assert set(errors) == set(bad)
+    assert '404' in errors[bad[0]]
+    # 每页的词频和单独处理一样，合计是所有页面的和
+    expected = segment.tokenize_and_count(html_text.html_to_clean_text(server.page, 'utf-8'), parallel=False)
+    assert all(Counter(line['counts']) == expected for line in lines if 'counts' in line)
+    with open(tmp_path / 'aggregate.json', encoding='utf-8') as file:
+        aggregate = json.load(file)
+    assert aggregate == {word: count * len(urls) for word, count in expected.items()}
+
+
+class FastSession:
+    '''
+    立刻返回的假session，下载比处理快得多
+    '''
+
+    def __init__(self, state):
+        self.state = state
+
+    def get(self, url, timeout=None):
+        with self.state['lock']:
+            self.state['waiting'] += 1
+            self.state['max_waiting'] = max(self.state['max_waiting'], self.state['waiting'])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'<p>fake</p>'
+        return response
+
+
+def test_fetched_pages_are_bounded(monkeypatch):
+    state = {'lock': threading.Lock(), 'waiting': 0, 'max_waiting': 0}
+
+    def slow_process(content, encoding):
+        time.sleep(0.01)
+        with state['lock']:
+            state['waiting'] -= 1
+        return Counter({'fake': 1})
+
+    monkeypatch.setattr(batch_corpus, 'process_page', slow_process)
+
+    async def run():
+        session = FastSession(state)
+        total_limit = asyncio.Semaphore(4)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(4))
+        process_limit = asyncio.Semaphore(6)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            tasks = [batch_corpus.fetch_and_count(f'http://host{i % 3}/{i}', session, pool, total_limit, host_limits,
+                                                  process_limit, 10) for i in range(60)]
+            return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert all(error is None for _, _, error in results)
+    # 下载好还没处理完的页面不超过处理名额
+    assert state['max_waiting'] <= 6
+
+
+def test_read_urls(tmp_path):
+    path = tmp_path / 'urls.txt'
+    path.write_text('# 注释\nhttp://a/1\n\n  http://b/2  \n', encoding='utf-8')
+    assert batch_corpus.read_urls(str(path)) == ['http://a/1', 'http://b/2']
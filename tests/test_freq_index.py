@@ -0,0 +1,68 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_freq_index.py
+import random
+from collections import Counter
+
+import pytest
+
+from freq_index import FrequencyIndex
+
+
+def filtered(counter, min_count, max_count):
+    # 原来的写法：遍历整个字典筛选
+    return {token: count for token, count in counter.items() if min_count <= count <= max_count}
+
+
+COUNTERS = [
+    Counter(),
+    Counter({'经济': 5}),
+    Counter({'发展': 3, '经济': 5, '改革': 3, '开放': 1, '市场': 3, '主体': 5}),  # 次数相同的词语
+    Counter('国务院关于进一步优化营商环境更好服务市场主体的实施意见'),
+]
+
+
+@pytest.mark.parametrize('counter', COUNTERS)
+def test_most_common_matches_counter(counter):
+    index = FrequencyIndex(counter)
+    assert len(index) == len(counter)
+    assert index.most_common() == counter.most_common()
+    for n in (0, 1, 2, 3, len(counter), len(counter) + 5):
+        assert index.most_common(n) == counter.most_common(n)
+    assert index.max_count == max(counter.values(), default=0)
+
+
+@pytest.mark.parametrize('counter', COUNTERS)
+def test_range_matches_filter(counter):
+    index = FrequencyIndex(counter)
+    top = index.max_count
+    for lo in range(0, top + 2):
+        for hi in range(0, top + 2):
+            view = index.range(lo, hi)
+            expected = filtered(counter, lo, hi)
+            assert dict(view.items()) == expected
+            assert len(view) == len(expected)
+            # 视图的顺序和Counter.most_common一样，次数相同的保持原来的先后顺序
+            assert list(view.items()) == Counter(expected).most_common()
+            assert list(view.keys()) == [token for token, _ in Counter(expected).most_common()]
+            assert list(view.values()) == sorted(expected.values(), reverse=True)
+            assert view.most_common(2) == Counter(expected).most_common(2)
+
+
+def test_range_boundaries_are_inclusive():
+    index = FrequencyIndex(Counter({'a': 1, 'b': 2, 'c': 3, 'd': 3}))
+    assert list(index.range(2, 3)) == ['c', 'd', 'b']
+    assert list(index.range(3, 3)) == ['c', 'd']
+    assert list(index.range(4, 10)) == []
+    assert list(index.range(3, 2)) == []
+    assert len(index.range(3, 1)) == 0
+
+
+def test_all_and_random_counters():
+    rng = random.Random(0)
+    for _ in range(100):
+        counter = Counter({f'w{i}': rng.randint(1, 8) for i in range(rng.randint(0, 30))})
+        index = FrequencyIndex(counter)
+        assert list(index.all().items()) == counter.most_common()
+        lo, hi = rng.randint(0, 9), rng.randint(0, 9)
+        assert list(index.range(lo, hi).items()) == Counter(filtered(counter, lo, hi)).most_common()
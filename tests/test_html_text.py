@@ -0,0 +1,47 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_html_text.py
+import pytest
+from bs4 import BeautifulSoup
+
+import html_text
+
+
+@pytest.mark.parametrize('content', [
+    '<p>中文内容</p>'.encode('utf-8'),
+    '<html><body><p>中文内容</p></body></html>'.encode('utf-8'),
+    '﻿<p>中文内容</p>'.encode('utf-8'),
+    '<html><head><meta charset="gbk"></head><body><p>中文内容</p></body></html>'.encode('gbk'),
+    '<meta http-equiv="Content-Type" content="text/html; charset=gb2312"><p>中文内容</p>'.encode('gbk'),
+    '<p>没有声明编码的国标页面内容</p>'.encode('gb18030'),
+])
+def test_without_charset_header_matches_bs4(content):
+    # 响应头里没有charset时，和原来的 BeautifulSoup(..., 'html.parser') 得到一样的中文
+    assert html_text.html_to_text(content) == BeautifulSoup(content, 'html.parser').get_text()
+
+
+def test_header_encoding_wins():
+    content = '<p>中文内容</p>'.encode('gbk')
+    assert html_text.html_to_text(content, 'gbk') == '中文内容'
+
+
+def test_unknown_header_encoding_falls_back_to_detection():
+    assert html_text.html_to_text('<p>中文内容</p>'.encode('utf-8'), 'no-such-charset') == '中文内容'
+
+
+@pytest.mark.parametrize('content', [
+    b'', b'  \n', b'<!-- only a comment -->', b'<?xml version="1.0" encoding="utf-8"?>',
+])
+def test_empty_documents(content):
+    assert html_text.html_to_text(content) == ''
+    assert html_text.html_to_text(content, 'utf-8') == ''
+
+
+def test_non_content_tags_removed():
+    content = ('<html><head><style>p{color:red}</style><script>var a="脚本";</script></head>'
+               '<body><p>正文<noscript>请开启</noscript>结尾</p></body></html>').encode('utf-8')
+    assert html_text.html_to_text(content, 'utf-8') == '正文结尾'
+
+
+def test_clean_text():
+    assert html_text.clean_text('国务院，<b>关于</b>  优化!\n营商环境') == '国务院关于 优化 营商环境'
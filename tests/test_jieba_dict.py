@@ -0,0 +1,106 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_jieba_dict.py
+import functools
+import os
+
+import jieba
+import pytest
+
+import jieba_dict
+import segment
+
+TEXT = '国务院关于进一步优化营商环境更好服务市场主体的实施意见，激发市场主体活力，石墨烯和区块链的发展。'
+
+
+@pytest.fixture
+def default_tokenizer():
+    # 测试会替换jieba默认分词器的词典和模块里记住的停用词，结束后还原
+    saved = (jieba.dt.FREQ, jieba.dt.total, jieba.dt.initialized, jieba_dict._stopwords)
+    jieba_dict._stopwords = None
+    yield jieba.dt
+    with jieba.dt.lock:
+        jieba.dt.FREQ, jieba.dt.total, jieba.dt.initialized = saved[:3]
+    jieba_dict._stopwords = saved[3]
+
+
+@pytest.fixture
+def files(tmp_path):
+    user_dict = tmp_path / 'userdict.txt'
+    # 一个写了词频和词性，一个什么都没写
+    user_dict.write_text('营商环境 20 n\n市场主体\n', encoding='utf-8')
+    stopwords = tmp_path / 'stopwords.txt'
+    stopwords.write_text('﻿关于\n 进一步 \n\n实施\n', encoding='utf-8')
+    return str(user_dict), str(stopwords), str(tmp_path / 'cache')
+
+
+@functools.lru_cache(maxsize=None)
+def stock_tokenizer():
+    tokenizer = jieba.Tokenizer()
+    tokenizer.initialize()
+    return tokenizer
+
+
+def stock_lcut(user_dict=None):
+    # 不经过jieba_dict，直接用jieba自己的词典和load_userdict
+    tokenizer = jieba.Tokenizer()
+    tokenizer.FREQ, tokenizer.total = dict(stock_tokenizer().FREQ), stock_tokenizer().total
+    tokenizer.initialized = True
+    if user_dict is not None:
+        tokenizer.load_userdict(user_dict)
+    return tokenizer.lcut(TEXT)
+
+
+def test_user_dict_matches_stock_jieba(default_tokenizer, files):
+    user_dict, stopwords, cache_dir = files
+    jieba_dict.load(user_dict, stopwords, cache_dir)
+    words = jieba.lcut(TEXT)
+    assert words == stock_lcut(user_dict)
+    assert '营商环境' in words and '市场主体' in words
+    assert words != stock_lcut()
+
+
+def test_without_user_dict_matches_stock_jieba(default_tokenizer, tmp_path):
+    missing = str(tmp_path / 'missing.txt')
+    assert jieba_dict.load(missing, missing, str(tmp_path / 'cache')) == frozenset()
+    assert jieba.lcut(TEXT) == stock_lcut()
+
+
+def test_stopwords_are_applied(default_tokenizer, files):
+    user_dict, stopwords, cache_dir = files
+    assert jieba_dict.read_stopwords(stopwords) == {'关于', '进一步', '实施'}
+    assert jieba_dict.load(user_dict, stopwords, cache_dir) == {'关于', '进一步', '实施'}
+    words = segment.lcut(TEXT)
+    assert '关于' in words and '实施' in words
+    counts = segment.count_words(words)
+    assert not {'关于', '进一步', '实施'} & set(counts)
+    assert counts['市场主体'] == 2
+
+
+def test_cache_is_reused_and_follows_file_changes(default_tokenizer, files, monkeypatch):
+    user_dict, stopwords, cache_dir = files
+    jieba_dict.load(user_dict, stopwords, cache_dir)
+    path = jieba_dict.cache_path(user_dict, stopwords, cache_dir)
+    assert os.listdir(cache_dir) == [os.path.basename(path)]
+    # 新进程：直接读缓存，不重新生成
+    jieba_dict._stopwords = None
+    with monkeypatch.context() as patch:
+        patch.setattr(jieba_dict, 'build', lambda *args: pytest.fail("不应该重新生成"))
+        jieba_dict.load(user_dict, stopwords, cache_dir)
+    assert jieba.lcut(TEXT) == stock_lcut(user_dict)
+    # 停用词改了，换一个缓存文件
+    with open(stopwords, 'a', encoding='utf-8') as file:
+        file.write('活力\n')
+    assert jieba_dict.cache_path(user_dict, stopwords, cache_dir) != path
+    assert '活力' in jieba_dict.build(user_dict, stopwords, cache_dir)['stopwords']
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_broken_cache_is_rebuilt(default_tokenizer, files):
+    user_dict, stopwords, cache_dir = files
+    path = jieba_dict.cache_path(user_dict, stopwords, cache_dir)
+    os.makedirs(cache_dir)
+    with open(path, 'wb') as file:
+        file.write(b'not a pickle')
+    jieba_dict.load(user_dict, stopwords, cache_dir)
+    assert jieba.lcut(TEXT) == stock_lcut(user_dict)
@@ -0,0 +1,73 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_keyword_match.py
+import random
+
+import pytest
+
+from keyword_match import KeywordMatcher, count_keywords
+
+
+def brute_overlapping(text, keyword):
+    # 每个位置都试一次，可以重叠
+    return sum(text.startswith(keyword, i) for i in range(len(text)))
+
+
+def expected(text, keywords, overlapping, ignore_case=True):
+    if ignore_case:
+        text = text.lower()
+    result = {}
+    for keyword in keywords:
+        pattern = keyword.lower() if ignore_case else keyword
+        result[keyword] = brute_overlapping(text, pattern) if overlapping else text.count(pattern)
+    return result
+
+
+CASES = [
+    ('发展经济，经济发展，发展发展', ['发展', '经济', '改革']),
+    ('Market market MARKET marKet', ['market']),
+    ('Market market MARKET marKet', ['Market', 'MARKET', 'market']),  # 只有大小写不同的关键词
+    ('经济经济经济', ['经济', '经济']),  # 重复的关键词
+    ('aaaaaa', ['a', 'aa', 'aaa']),
+    ('abcabcab', ['abc', 'bca', 'cab', 'ab', 'bc', 'c']),
+    ('国务院常务会议国务院', ['国务院', '国务', '务院', '会议', '常务会']),  # 前缀、后缀关键词
+    ('ushers she he his hers', ['he', 'she', 'his', 'hers']),
+    ('', ['空']),
+    ('没有关键词的文本', []),
+]
+
+
+@pytest.mark.parametrize('overlapping', [False, True])
+@pytest.mark.parametrize('text, keywords', CASES)
+def test_matches_str_count(text, keywords, overlapping):
+    assert KeywordMatcher(keywords).count(text, overlapping=overlapping) == expected(text, keywords, overlapping)
+    assert count_keywords(text, keywords, overlapping=overlapping) == expected(text, keywords, overlapping)
+
+
+@pytest.mark.parametrize('overlapping', [False, True])
+def test_case_sensitive(overlapping):
+    text = 'Market market MARKET aAaA'
+    keywords = ['Market', 'market', 'MARKET', 'aA', 'Aa']
+    assert (KeywordMatcher(keywords, ignore_case=False).count(text, overlapping=overlapping)
+            == expected(text, keywords, overlapping, ignore_case=False))
+
+
+def test_lowered_text_is_not_lowered_again():
+    matcher = KeywordMatcher(['Market'])
+    assert matcher.count('market MARKET'.lower(), lowered=True) == {'Market': 2}
+    # 说了已经是小写，就按原样匹配
+    assert matcher.count('MARKET', lowered=True) == {'Market': 0}
+
+
+def test_empty_keyword_counts_zero():
+    assert KeywordMatcher(['', '经济']).count('经济') == {'': 0, '经济': 1}
+    assert KeywordMatcher([]).count('经济') == {}
+
+
+@pytest.mark.parametrize('overlapping', [False, True])
+def test_random_texts(overlapping):
+    rng = random.Random(0)
+    for _ in range(300):
+        text = ''.join(rng.choice('abAB经') for _ in range(rng.randint(0, 30)))
+        keywords = [''.join(rng.choice('abAB经') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        assert KeywordMatcher(keywords).count(text, overlapping=overlapping) == expected(text, keywords, overlapping)
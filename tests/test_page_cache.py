@@ -0,0 +1,195 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_page_cache.py
+import http.server
+import sqlite3
+import threading
+import time
+
+import pytest
+import requests
+
+from page_cache import PageCache
+
+
+class Site:
+    '''
+    本地HTTP服务：每个路径一个页面，带ETag，支持304，可以切换成返回错误
+    '''
+
+    def __init__(self):
+        self.pages = {}  # path -> (body, etag)
+        self.status = 200
+        self.delay = 0
+        self.requests = []  # (path, If-None-Match)
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                etag_sent = self.headers.get('If-None-Match')
+                site.requests.append((self.path, etag_sent))
+                time.sleep(site.delay)
+                if site.status != 200:
+                    self.send_response(site.status)
+                    self.end_headers()
+                    self.wfile.write(b'oops')
+                    return
+                body, etag = site.pages[self.path]
+                if etag_sent == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+
+def ext1(content, encoding):
+    return 'EXT1:' + content.decode(encoding)
+
+
+def ext2(content, encoding):
+    return 'EXT2:' + content.decode(encoding)
+
+
+@pytest.fixture
+def site():
+    site = Site()
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'pages.sqlite3')
+
+
+def test_hit_from_memory_and_disk(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    cache = PageCache(path=path)
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    # 另一个实例（比如另一个进程）直接读磁盘
+    other = PageCache(path=path)
+    assert other.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert len(site.requests) == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert other.stats()['hits'] == 1
+    assert cache.stats()['entries'] == 1 and cache.stats()['bytes'] == 5
+
+
+def test_different_extractors(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    cache = PageCache(path=path)
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert cache.get(site.url('/a'), ext2) == 'EXT2:hello'
+    assert PageCache(path=path).get(site.url('/a'), ext2) == 'EXT2:hello'
+    assert len(site.requests) == 1
+
+
+def test_revalidate_after_ttl(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    cache = PageCache(path=path, ttl=0)
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    # 没变：304，还是原来的内容
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert site.requests[-1] == ('/a', '"v1"')
+    assert cache.stats()['revalidations'] == 1
+    # 变了：返回新的内容
+    site.pages['/a'] = (b'world', '"v2"')
+    assert cache.get(site.url('/a'), ext2) == 'EXT2:world'
+    assert PageCache(path=path, ttl=0).get(site.url('/a'), ext2) == 'EXT2:world'
+    assert cache.stats()['misses'] == 2
+
+
+def test_stale_on_error(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    cache = PageCache(path=path, ttl=0)
+    cache.get(site.url('/a'), ext1)
+    site.status = 500
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert cache.stats()['stale'] == 1
+    # 没有缓存时出错直接抛出
+    with pytest.raises(requests.HTTPError):
+        cache.get(site.url('/b'), ext1)
+    assert cache.stats()['entries'] == 1
+
+
+def test_stale_when_unreachable(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    url = site.url('/a')
+    cache = PageCache(path=path, ttl=0)
+    cache.get(url, ext1)
+    site.server.shutdown()
+    site.server.server_close()
+    assert cache.get(url, ext1) == 'EXT1:hello'
+    with pytest.raises(requests.ConnectionError):
+        cache.get(url.replace('/a', '/b'), ext1)
+
+
+def test_stale_when_hanging_then_backs_off(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    cache = PageCache(path=path, ttl=0, timeout=0.2, stale_retry=60)
+    cache.get(site.url('/a'), ext1)
+    # 服务器卡住：超时以后用旧的内容，不会一直等
+    site.delay = 1
+    start = time.monotonic()
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert time.monotonic() - start < 0.9
+    assert cache.stats()['stale'] == 1
+    # stale_retry秒之内不再请求，别的实例读磁盘也一样
+    assert cache.get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert PageCache(path=path, ttl=0).get(site.url('/a'), ext1) == 'EXT1:hello'
+    assert len(site.requests) == 2
+
+
+def test_stale_retry_zero_revalidates_every_time(site, path):
+    site.pages['/a'] = (b'hello', '"v1"')
+    cache = PageCache(path=path, ttl=0, stale_retry=0)
+    cache.get(site.url('/a'), ext1)
+    site.status = 503
+    cache.get(site.url('/a'), ext1)
+    cache.get(site.url('/a'), ext1)
+    assert len(site.requests) == 3 and cache.stats()['stale'] == 2
+
+
+def test_evicts_least_recently_used(site, path):
+    for name in 'abc':
+        site.pages['/' + name] = (name.encode() * 10, '"v1"')
+    cache = PageCache(path=path, max_bytes=25)
+    cache.touch_interval = 0
+    cache.get(site.url('/a'), ext1)
+    cache.get(site.url('/b'), ext1)
+    # a在内存里命中，磁盘上的访问时间也要更新，淘汰的应该是b
+    cache.get(site.url('/a'), ext1)
+    cache.get(site.url('/c'), ext1)
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2 and stats['bytes'] == 20
+    other = PageCache(path=path)
+    other.get(site.url('/a'), ext1)
+    other.get(site.url('/b'), ext1)
+    assert [request[0] for request in site.requests] == ['/a', '/b', '/c', '/b']
+
+
+def test_old_schema_is_dropped(site, path):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE pages (url TEXT PRIMARY KEY, text TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+                 'fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)')
+    conn.execute("INSERT INTO pages VALUES (?, 'old text', '\"v1\"', NULL, 1e12, 1e12, 8)", (site.url('/a'),))
+    conn.commit()
+    conn.close()
+    site.pages['/a'] = (b'hello', '"v1"')
+    assert PageCache(path=path).get(site.url('/a'), ext1) == 'EXT1:hello'
@@ -0,0 +1,60 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_segment.py
+import io
+import os
+
+import html_text
+import segment
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures',
+                       'small.txt')
+
+
+def load_text():
+    with open(FIXTURE, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def test_split_chunks_rejoin():
+    text = load_text() * 5
+    chunks = segment.split_chunks(text, chunk_size=300)
+    assert len(chunks) > 1
+    assert ''.join(chunks) == text
+
+
+def test_parallel_matches_serial():
+    text = html_text.clean_text(load_text() * 5)
+    serial = segment.tokenize_and_count(text, parallel=False)
+    parallel = segment.parallel_count(text, chunk_size=500)
+    assert list(parallel.items()) == list(serial.items())
+
+
+def test_stream_matches_whole_file():
+    text = load_text() * 20
+    whole = segment.tokenize_and_count(html_text.clean_text(text))
+    streamed = segment.count_stream(io.BytesIO(text.encode('utf-8')), html_text.clean_text, block_size=1000)
+    assert streamed == whole
+
+
+def test_stream_single_line_is_bounded():
+    # 没有换行也没有空白的一整行：按max_pending切开，每次处理的文本有上限，进度也在中途更新
+    text = ''.join(load_text().split()) * 40
+    data = text.encode('utf-8')
+    sizes = []
+    progress = []
+
+    def clean(chunk):
+        sizes.append(len(chunk))
+        return html_text.clean_text(chunk)
+
+    streamed = segment.count_stream(io.BytesIO(data), clean, block_size=1000, max_pending=2000,
+                                    progress=progress.append)
+    assert len(sizes) > 5
+    assert max(sizes) <= 2000 + 1000
+    assert progress[0] < len(data) and progress[-1] == len(data)
+    whole = segment.tokenize_and_count(html_text.clean_text(text))
+    # 硬切开的地方可能分出不同的词，总数只差切口附近的几个
+    total = sum(whole.values())
+    assert abs(sum(streamed.values()) - total) <= 2 * len(sizes)
+    assert streamed.most_common(5) and whole.most_common(1)[0][0] == streamed.most_common(1)[0][0]
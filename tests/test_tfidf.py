@@ -0,0 +1,108 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file test_tfidf.py
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from tfidf import TfidfCorpus
+
+DOCUMENTS = [
+    Counter({'经济': 5, '发展': 3, '改革': 1}),
+    Counter({'发展': 2, '开放': 4}),
+    Counter({'经济': 1, '市场': 6, '主体': 2, '发展': 1}),
+    Counter({'改革': 3}),
+    Counter(),  # 空文档
+    Counter({'市场': 1, '开放': 1, '环境': 2}),
+]
+
+
+def random_documents(n, seed=0):
+    rng = random.Random(seed)
+    words = [f'词{i}' for i in range(40)]
+    return [Counter({word: rng.randint(1, 9) for word in rng.sample(words, rng.randint(1, 15))}) for _ in range(n)]
+
+
+def sklearn_tfidf(corpus, sublinear_tf):
+    return TfidfTransformer(sublinear_tf=sublinear_tf).fit_transform(corpus.counts()).toarray()
+
+
+@pytest.mark.parametrize('sublinear_tf', [False, True])
+@pytest.mark.parametrize('documents', [DOCUMENTS, random_documents(50)])
+def test_matches_sklearn(documents, sublinear_tf):
+    corpus = TfidfCorpus(sublinear_tf=sublinear_tf)
+    corpus.add(documents)
+    assert corpus.counts().shape == (len(documents), len(corpus.terms))
+    for row, counter in enumerate(documents):
+        assert {corpus.terms[c]: v for c, v in zip(corpus.counts()[row].indices, corpus.counts()[row].data)} == counter
+    transformer = TfidfTransformer(sublinear_tf=sublinear_tf).fit(corpus.counts())
+    np.testing.assert_allclose(corpus.idf, transformer.idf_)
+    np.testing.assert_allclose(corpus.tfidf().toarray(), sklearn_tfidf(corpus, sublinear_tf))
+    # 不加入语料库的打分也和sklearn的transform一样
+    others = [Counter({'经济': 2, '没见过': 7}), Counter({'词3': 1, '词5': 4})]
+    counts = np.zeros((len(others), len(corpus.terms)))
+    for row, counter in enumerate(others):
+        for term, count in counter.items():
+            if term in corpus.vocabulary:
+                counts[row, corpus.vocabulary[term]] = count
+    expected = transformer.transform(counts).toarray()
+    np.testing.assert_allclose(corpus.transform(others).toarray(), expected)
+
+
+@pytest.mark.parametrize('batches', [[6], [1, 5], [2, 2, 2], [1, 1, 1, 1, 1, 1], [0, 3, 0, 3]])
+def test_incremental_add_equals_rebuild(batches):
+    full = TfidfCorpus()
+    full.add(DOCUMENTS, names=[f'doc{i}' for i in range(len(DOCUMENTS))])
+    corpus = TfidfCorpus()
+    start = 0
+    for size in batches:
+        rows = corpus.add(DOCUMENTS[start:start + size], names=[f'doc{i}' for i in range(start, start + size)])
+        assert rows == range(start, start + size)
+        # 每加一批都要重新计算，不能用加之前的结果
+        corpus.tfidf()
+        start += size
+    assert corpus.names == full.names and corpus.terms == full.terms and len(corpus) == len(full)
+    np.testing.assert_array_equal(corpus.counts().toarray(), full.counts().toarray())
+    np.testing.assert_allclose(corpus.idf, full.idf)
+    np.testing.assert_allclose(corpus.tfidf().toarray(), full.tfidf().toarray())
+
+
+def test_incremental_add_random():
+    documents = random_documents(60, seed=1)
+    full = TfidfCorpus(sublinear_tf=True)
+    full.add(documents)
+    corpus = TfidfCorpus(sublinear_tf=True)
+    for start in range(0, 60, 7):
+        corpus.add(documents[start:start + 7])
+    np.testing.assert_allclose(corpus.tfidf().toarray(), full.tfidf().toarray())
+    assert corpus.top_k(5) == full.top_k(5)
+
+
+@pytest.mark.parametrize('k', [1, 2, 3, 10])
+def test_top_k(k):
+    corpus = TfidfCorpus()
+    corpus.add(DOCUMENTS + random_documents(20))
+    dense = corpus.tfidf().toarray()
+    top = corpus.top_k(k)
+    assert len(top) == len(corpus)
+    for row, keywords in enumerate(top):
+        nonzero = np.count_nonzero(dense[row])
+        assert len(keywords) == min(k, nonzero)
+        scores = [score for _, score in keywords]
+        assert scores == sorted(scores, reverse=True)
+        # 取到的就是这一行最大的k个分数，分数也对得上
+        np.testing.assert_allclose(scores, np.sort(dense[row][dense[row] > 0])[::-1][:k])
+        for term, score in keywords:
+            assert score == pytest.approx(dense[row, corpus.vocabulary[term]])
+
+
+def test_top_k_of_transform_and_empty_corpus():
+    assert TfidfCorpus().top_k(3) == []
+    corpus = TfidfCorpus()
+    corpus.add(DOCUMENTS)
+    top = corpus.top_k(2, corpus.transform([Counter({'市场': 3, '经济': 1, '没见过': 5}), Counter()]))
+    assert [term for term, _ in top[0]] == ['市场', '经济']
+    assert top[1] == []
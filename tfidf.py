@@ -0,0 +1,142 @@
+# @author xiaoyu
+# @date 2026/10/18
+# @file tfidf.py
+import numpy as np
+from scipy import sparse
+
+
+class TfidfCorpus:
+    '''
+    多篇文档的TF-IDF。输入是 tokenize_and_count 得到的Counter，
+    内部是scipy稀疏的文档-词语矩阵，idf和每篇文档的前k个关键词都是向量化计算的。
+    词表和文档频率随 add 增量更新，加入新文档不需要重新处理旧文档。
+    idf的算法和scikit-learn默认的一样：ln((1 + n) / (1 + df)) + 1，结果按行做L2归一化。
+    '''
+
+    def __init__(self, sublinear_tf=False):
+        '''
+        :param sublinear_tf: 为True时词频用 1 + ln(tf)
+        '''
+        self.sublinear_tf = sublinear_tf
+        self.vocabulary = {}
+        self.terms = []
+        self.names = []
+        self._df = np.zeros(0, dtype=np.int64)
+        self._indptr = [0]
+        self._indices = []
+        self._data = []
+        self._counts = None
+        self._tfidf = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, counters, names=None):
+        '''
+        :param counters: Counter列表，每篇文档一个
+        :param names: 文档的名字（比如网址），默认用序号
+        :return: 新加入的文档在语料库里的行号
+        '''
+        first = len(self.names)
+        vocabulary = self.vocabulary
+        terms = self.terms
+        new_indices = []
+        for i, counter in enumerate(counters):
+            for term in counter:
+                if term not in vocabulary:
+                    vocabulary[term] = len(terms)
+                    terms.append(term)
+            indices = np.fromiter(map(vocabulary.__getitem__, counter), dtype=np.int64, count=len(counter))
+            data = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+            self._indices.append(indices)
+            self._data.append(data)
+            self._indptr.append(self._indptr[-1] + len(indices))
+            new_indices.append(indices)
+            self.names.append(names[i] if names is not None else str(first + i))
+        # 文档频率：新文档里每个词出现在几篇文档里，加到原来的上面
+        if new_indices:
+            df = np.bincount(np.concatenate(new_indices), minlength=len(terms))
+            df[:len(self._df)] += self._df
+            self._df = df
+        self._counts = None
+        self._tfidf = None
+        return range(first, len(self.names))
+
+    @property
+    def idf(self):
+        n = len(self.names)
+        return np.log((1 + n) / (1 + self._df)) + 1
+
+    def counts(self):
+        '''
+        :return: 文档-词语的词频矩阵（csr），形状是 (文档数, 词表大小)
+        '''
+        if self._counts is None:
+            indices = np.concatenate(self._indices) if self._indices else np.zeros(0, dtype=np.int64)
+            data = np.concatenate(self._data) if self._data else np.zeros(0)
+            self._counts = sparse.csr_matrix((data, indices, np.asarray(self._indptr)),
+                                             shape=(len(self.names), len(self.terms)))
+        return self._counts
+
+    def _weight(self, matrix):
+        matrix = matrix.copy()
+        if self.sublinear_tf:
+            np.log(matrix.data, out=matrix.data)
+            matrix.data += 1
+        # 每一列乘上idf，再把每一行归一化
+        matrix.data *= self.idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+        return matrix
+
+    def tfidf(self):
+        '''
+        :return: TF-IDF矩阵（csr），加入新文档之前重复调用不会重新计算
+        '''
+        if self._tfidf is None:
+            self._tfidf = self._weight(self.counts())
+        return self._tfidf
+
+    def top_k(self, k=30, matrix=None):
+        '''
+        :param k: 每篇文档取前几个关键词
+        :param matrix: 需要排序的TF-IDF矩阵，默认是整个语料库
+        :return: 每篇文档一个列表 [(词语, 分数)]，按分数从大到小
+        '''
+        if matrix is None:
+            matrix = self.tfidf()
+        if matrix.shape[0] == 0:
+            return []
+        lengths = np.diff(matrix.indptr)
+        rows = np.repeat(np.arange(matrix.shape[0]), lengths)
+        # 先按行、再按分数从大到小排序，每行的前k个就是这一行排名小于k的元素
+        order = np.lexsort((-matrix.data, rows))
+        rank = np.arange(len(order)) - matrix.indptr[rows]
+        keep = order[rank < k]
+        columns = matrix.indices[keep]
+        scores = matrix.data[keep]
+        bounds = np.cumsum(np.minimum(lengths, k))[:-1]
+        terms = self.terms
+        return [[(terms[c], float(s)) for c, s in zip(cols, vals)]
+                for cols, vals in zip(np.split(columns, bounds), np.split(scores, bounds))]
+
+    def transform(self, counters):
+        '''
+        :param counters: Counter列表，用当前的词表和idf打分，不加入语料库
+        :return: TF-IDF矩阵（csr），没见过的词语忽略
+        '''
+        indptr = [0]
+        indices = []
+        data = []
+        vocabulary = self.vocabulary
+        for counter in counters:
+            for term, count in counter.items():
+                column = vocabulary.get(term)
+                if column is not None:
+                    indices.append(column)
+                    data.append(count)
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix((np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64),
+                                    np.asarray(indptr)), shape=(len(indptr) - 1, len(self.terms)))
+        return self._weight(matrix)